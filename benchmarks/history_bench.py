@@ -0,0 +1,116 @@
+"""Latency the item history adds to the write routes.
+
+    python -m benchmarks.history_bench --url postgresql+psycopg2://postgres@localhost/bench
+
+Runs toggle_bucket_item_completion (a fresh session per call, like get_db)
+with the history writer stopped, where record() returns right away, and
+started, in alternating rounds so drift hits both sides alike. The writer
+flushes to the same database meanwhile. Then it times record() on its own
+and one flush of everything it buffered. Tables are created in the
+bucket_list_app schema of the target database if missing.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, DB_SCHEMA
+from models.account import Account  # noqa: F401 (collaborator foreign key target)
+from models.bucket_list import BucketList, BucketItem
+from routes.account_routes import create_access_token
+from routes.bucket_item_routes import toggle_bucket_item_completion
+from services.item_history import HistoryWriter, history_writer
+from services.read_queries import BucketItemRecord
+
+
+def seed(Session, items):
+    with Session() as session:
+        bucket_list = BucketList(title="history bench", created_by=1)
+        session.add(bucket_list)
+        session.flush()
+        session.execute(insert(BucketItem), [
+            {"bucket_list_id": bucket_list.id, "content": f"Item {i}", "last_modified_by": 1,
+             "position": f"a{i:05d}"}
+            for i in range(items)
+        ])
+        session.commit()
+        item_ids = session.execute(
+            text(f"SELECT id FROM {DB_SCHEMA}.bucket_item WHERE bucket_list_id = :id"), {"id": bucket_list.id}
+        ).scalars().all()
+        return bucket_list.id, item_ids
+
+
+def toggles(Session, token, bucket_list_id, item_ids, iterations):
+    timings = []
+    for i in range(iterations):
+        with Session() as session:
+            start = time.perf_counter()
+            toggle_bucket_item_completion(
+                token=token, item_id=item_ids[i % len(item_ids)], bucket_list_id=bucket_list_id, db=session
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    quantiles = statistics.quantiles(timings, n=100)
+    print(f"{name:>24}: median {statistics.median(timings):7.3f} ms  "
+          f"p95 {quantiles[94]:7.3f} ms  p99 {quantiles[98]:7.3f} ms")
+    return quantiles[98]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=300, help="toggles per round and mode")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, connect_args={"options": f"-csearch_path={DB_SCHEMA}"})
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {DB_SCHEMA}"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    bucket_list_id, item_ids = seed(Session, args.items)
+    token = create_access_token({"sub": "1"})
+    history_writer.session_factory = Session
+
+    toggles(Session, token, bucket_list_id, item_ids, 50)  # Warm-up
+    results = {"history off": [], "history on": []}
+    for round_number in range(args.rounds):
+        modes = ("history off", "history on") if round_number % 2 == 0 else ("history on", "history off")
+        for mode in modes:
+            if mode == "history on":
+                history_writer.start()
+            results[mode] += toggles(Session, token, bucket_list_id, item_ids, args.iterations)
+            history_writer.stop()
+
+    print(f"toggle route, {args.rounds} x {args.iterations} calls per mode")
+    p99_off = report("history off", results["history off"])
+    p99_on = report("history on", results["history on"])
+    print(f"{'added p99':>24}: {p99_on - p99_off:+7.3f} ms")
+
+    # record() alone, then one flush of everything it buffered
+    writer = HistoryWriter(session_factory=Session, flush_interval=3600, max_pending=args.records)
+    writer.start()
+    item = BucketItemRecord((item_ids[0], bucket_list_id, "Item", False, 1, None, "a0"))
+    start = time.perf_counter()
+    for _ in range(args.records):
+        writer.record(item, "toggled", 1)
+    record_us = (time.perf_counter() - start) / args.records * 1e6
+    print(f"{'record()':>24}: {record_us:7.3f} us per event")
+
+    start = time.perf_counter()
+    writer.stop()
+    elapsed = time.perf_counter() - start
+    print(f"{'flush':>24}: {args.records} events in {elapsed:.2f}s ({args.records / elapsed:,.0f} events/s)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Plain vs hash-partitioned bucket_item at large row counts.
+
+    python -m benchmarks.partition_bench --url postgresql+psycopg2://postgres@localhost/bench --rows 10000000
+
+Loads --rows items spread over --lists lists with generate_series into two
+tables of the bucket_list_app schema: bucket_item_plain (the pre-partitioning
+layout, primary key on id) and bucket_item (the model's partitioned table).
+Then it times item lookups by list and single-row inserts on both, and
+checks with EXPLAIN that the item statements of the routes only scan one
+partition. Use a scratch database, the schema is dropped first.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, delete, select, text, update
+
+from database import Base, DB_SCHEMA
+from models.account import Account  # noqa: F401 (collaborator foreign key target)
+from models.bucket_list import BucketItem
+from services import read_queries
+
+PLAIN_TABLE_DDL = f"""
+CREATE TABLE {DB_SCHEMA}.bucket_item_plain (
+    id SERIAL PRIMARY KEY,
+    bucket_list_id INTEGER NOT NULL REFERENCES {DB_SCHEMA}.bucket_list (id) ON DELETE CASCADE,
+    last_modified_by INTEGER,
+    date_last_modified TIMESTAMP WITH TIME ZONE,
+    content TEXT NOT NULL,
+    is_completed BOOLEAN,
+    position VARCHAR(255) COLLATE "C"
+)
+"""
+
+PLAIN_INDEX_DDL = (
+    f"CREATE INDEX ix_bucket_item_plain_list_position ON {DB_SCHEMA}.bucket_item_plain (bucket_list_id, position)",
+)
+
+LOAD_SQL = """
+INSERT INTO {schema}.{table} (bucket_list_id, content, is_completed, last_modified_by, position)
+SELECT g % :lists + 1, 'Item ' || g, g % 3 = 0, 1, 'a' || lpad((g / :lists)::text, 8, '0')
+FROM generate_series(1, :rows) AS g
+"""
+
+LOOKUP_SQL = """
+SELECT id, bucket_list_id, content, is_completed, last_modified_by, date_last_modified, position
+FROM {schema}.{table} WHERE bucket_list_id = :bucket_list_id ORDER BY position, id
+"""
+
+INSERT_SQL = """
+INSERT INTO {schema}.{table} (bucket_list_id, content, last_modified_by, position)
+VALUES (:bucket_list_id, 'bench', 1, 'zz') RETURNING id
+"""
+
+
+def setup(engine, rows, lists):
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {DB_SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {DB_SCHEMA}"))
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(PLAIN_TABLE_DDL))
+        connection.execute(text(
+            f"INSERT INTO {DB_SCHEMA}.bucket_list (title, created_by, is_private) "
+            f"SELECT 'List ' || g, g % 1000 + 1, false FROM generate_series(1, :lists) AS g"
+        ), {"lists": lists})
+
+    for table, index_ddl in (("bucket_item_plain", PLAIN_INDEX_DDL), ("bucket_item", ())):
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            connection.execute(text(LOAD_SQL.format(schema=DB_SCHEMA, table=table)), {"rows": rows, "lists": lists})
+            for ddl in index_ddl:
+                connection.execute(text(ddl))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"VACUUM ANALYZE {DB_SCHEMA}.{table}"))
+        print(f"loaded {table}: {time.perf_counter() - start:.1f}s")
+
+
+def timed(connection, sql, params_list):
+    timings = []
+    for params in params_list:
+        start = time.perf_counter()
+        connection.execute(sql, params).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    quantiles = statistics.quantiles(timings, n=100)
+    print(f"{name:>28}: median {statistics.median(timings):7.3f} ms  "
+          f"p95 {quantiles[94]:7.3f} ms  p99 {quantiles[98]:7.3f} ms")
+
+
+def compare(engine, lists, iterations):
+    list_ids = [{"bucket_list_id": random.randint(1, lists)} for _ in range(iterations)]
+    for table in ("bucket_item_plain", "bucket_item"):
+        with engine.connect() as connection:
+            lookup = text(LOOKUP_SQL.format(schema=DB_SCHEMA, table=table))
+            timed(connection, lookup, list_ids[:50])  # Warm-up
+            report(f"{table} lookup", timed(connection, lookup, list_ids))
+
+        # Autocommit so each insert includes its commit, like a request
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            insert_item = text(INSERT_SQL.format(schema=DB_SCHEMA, table=table))
+            report(f"{table} insert", timed(connection, insert_item, list_ids))
+
+
+def scanned_partitions(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    relations = set()
+
+    def walk(node):
+        if node.get("Relation Name", "").startswith("bucket_item_p"):
+            relations.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return relations
+
+
+def check_pruning(engine):
+    """EXPLAIN the per-list item statements of the routes and count partitions."""
+    statements = {
+        "items_select": read_queries.items_select(42),
+        "return_item": select(BucketItem).where(BucketItem.id == 1, BucketItem.bucket_list_id == 42),
+        "item position": select(BucketItem.position).where(BucketItem.id == 1, BucketItem.bucket_list_id == 42),
+        "update item": update(BucketItem).where(BucketItem.bucket_list_id == 42, BucketItem.id == 1).values(
+            is_completed=True),
+        "delete item": delete(BucketItem).where(BucketItem.bucket_list_id == 42, BucketItem.id == 1),
+        "purge batch": delete(BucketItem).where(BucketItem.bucket_list_id == 42, BucketItem.id.in_(
+            select(BucketItem.id).where(BucketItem.bucket_list_id == 42).limit(1000).scalar_subquery())),
+    }
+    with engine.connect() as connection:
+        for name, statement in statements.items():
+            partitions = scanned_partitions(connection, statement)
+            print(f"{name:>28}: scans {sorted(partitions)}")
+            assert len(partitions) == 1, f"{name} is not pruned to one partition"
+        connection.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--lists", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--skip-load", action="store_true", help="reuse tables from a previous run")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, connect_args={"options": f"-csearch_path={DB_SCHEMA}"})
+    if not args.skip_load:
+        setup(engine, args.rows, args.lists)
+    print(f"{args.rows} items over {args.lists} lists, {args.iterations} iterations")
+    compare(engine, args.lists, args.iterations)
+    check_pruning(engine)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
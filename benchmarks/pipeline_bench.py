@@ -0,0 +1,165 @@
+"""Round trips of psycopg2 vs psycopg 3 pipeline mode, with injected latency.
+
+    python -m benchmarks.pipeline_bench --upstream 127.0.0.1:5432 --latency-ms 5
+
+--upstream is the real server, as host:port or a Unix socket path. A local
+proxy delays every packet by --latency-ms in each direction, which is what
+the Supabase pooler adds in production. The scenario is the cache-miss path
+of get_shared_bucket_list: the collaborator upsert plus the list and items
+reads, then commit. The benchmark creates its tables in the bucket_list_app
+schema of the target database.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, DB_SCHEMA
+from models.account import Account
+from models.bucket_list import BucketList, BucketItem, BucketListCollaborator
+from services import read_queries
+from services.pipeline import execute_pipelined
+
+
+class LatencyProxy:
+    """TCP proxy adding a fixed one-way delay to every packet."""
+
+    def __init__(self, upstream: str, latency: float):
+        self.upstream = upstream
+        self.latency = latency
+        self.port = None
+        self._ready = threading.Event()
+
+    async def _pipe(self, reader, writer):
+        queue = asyncio.Queue()
+
+        async def delayed_writer():
+            while True:
+                due, data = await queue.get()
+                if data is None:
+                    break
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        writer_task = asyncio.create_task(delayed_writer())
+        try:
+            while data := await reader.read(65536):
+                queue.put_nowait((time.perf_counter() + self.latency, data))
+        finally:
+            queue.put_nowait((0, None))
+            await writer_task
+
+    async def _handle(self, client_reader, client_writer):
+        if ":" in self.upstream:
+            host, port = self.upstream.rsplit(":", 1)
+            server_reader, server_writer = await asyncio.open_connection(host, int(port))
+        else:
+            server_reader, server_writer = await asyncio.open_unix_connection(self.upstream)
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer),
+            self._pipe(server_reader, client_writer),
+            return_exceptions=True
+        )
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start(self):
+        threading.Thread(target=lambda: asyncio.run(self._serve()), daemon=True).start()
+        self._ready.wait()
+        return self
+
+
+def make_engine(driver, port, args, prepare_threshold=None):
+    url = f"postgresql+{driver}://{args.user}:{args.password}@127.0.0.1:{port}/{args.dbname}"
+    connect_args = {"options": f"-csearch_path={DB_SCHEMA}"}
+    if driver == "psycopg":
+        connect_args["prepare_threshold"] = prepare_threshold
+    return create_engine(url, connect_args=connect_args, pool_size=1)
+
+
+def seed(engine, items):
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {DB_SCHEMA}"))
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        account = Account(username=f"bench-{time.time_ns()}", email=f"{time.time_ns()}@bench", password_hash="x")
+        bucket_list = BucketList(title="bench", created_by=1, is_private=False)
+        session.add_all([account, bucket_list])
+        session.flush()
+        session.execute(insert(BucketItem), [
+            {"bucket_list_id": bucket_list.id, "content": f"Item {i}", "last_modified_by": 1,
+             "position": f"a{i:03d}"}
+            for i in range(items)
+        ])
+        session.commit()
+        return account.id, bucket_list.id
+
+
+def scenario(session, account_id, bucket_list_id):
+    add_collaborator = pg_insert(BucketListCollaborator).values(
+        bucket_list_id=bucket_list_id, account_id=account_id, is_owner=False, access_date=func.now()
+    ).on_conflict_do_update(
+        index_elements=[BucketListCollaborator.bucket_list_id, BucketListCollaborator.account_id],
+        set_={"access_date": func.now()}
+    )
+    _, list_rows, item_rows = execute_pipelined(session, [
+        add_collaborator,
+        read_queries.bucket_list_select(bucket_list_id),
+        read_queries.items_select(bucket_list_id)
+    ])
+    session.commit()
+    assert list_rows and item_rows
+
+
+def run(engine, account_id, bucket_list_id, iterations):
+    Session = sessionmaker(bind=engine)
+    timings = []
+    for i in range(iterations + 5):
+        with Session() as session:
+            start = time.perf_counter()
+            scenario(session, account_id, bucket_list_id)
+            if i >= 5:  # Warm-up: connection setup and statement preparation
+                timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--upstream", required=True)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--dbname", default="postgres")
+    args = parser.parse_args()
+
+    proxy = LatencyProxy(args.upstream, args.latency_ms / 1000).start()
+    account_id, bucket_list_id = seed(make_engine("psycopg2", proxy.port, args), args.items)
+
+    print(f"{args.latency_ms} ms one-way latency, {args.iterations} iterations")
+    for name, engine in (
+            ("psycopg2 sequential", make_engine("psycopg2", proxy.port, args)),
+            ("psycopg pipeline", make_engine("psycopg", proxy.port, args)),
+            ("psycopg pipeline+prepared", make_engine("psycopg", proxy.port, args, prepare_threshold=0)),
+    ):
+        timings = run(engine, account_id, bucket_list_id, args.iterations)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{name:>26}: median {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Memory/latency of ORM reads vs services/read_queries.py.
+
+    python -m benchmarks.read_queries_bench --url postgresql+psycopg2://postgres@localhost/bench [--rows 100000]
+
+Postgres only, bucket_item's composite primary key (bucket_list_id, id)
+with a generated id can't be created on SQLite. Each path loads one list's
+items and serializes them with BucketItemResponse, like get_bucket_items
+does. Tables are created in the bucket_list_app schema of the target
+database if missing.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, DB_SCHEMA
+from models.account import Account  # noqa: F401 (collaborator foreign key target)
+from models.bucket_list import BucketList, BucketItem
+from routes.bucket_list_routes import BucketItemResponse
+from services import read_queries
+from services.item_ordering import key_between
+
+
+def seed(session, rows):
+    bucket_list = BucketList(title="bench", created_by=1)
+    session.add(bucket_list)
+    session.flush()
+
+    position = None
+    batch = []
+    for i in range(rows):
+        position = key_between(position, None)
+        batch.append({
+            "bucket_list_id": bucket_list.id,
+            "content": f"Item number {i}",
+            "is_completed": i % 3 == 0,
+            "last_modified_by": 1,
+            "position": position,
+        })
+    session.execute(insert(BucketItem), batch)
+    session.commit()
+    return bucket_list.id
+
+
+def orm_path(session, bucket_list_id):
+    items = session.query(BucketItem).filter(
+        BucketItem.bucket_list_id == bucket_list_id
+    ).order_by(BucketItem.position, BucketItem.id).all()
+    return [BucketItemResponse.model_validate(item) for item in items]
+
+
+def projected_path(session, bucket_list_id):
+    items = read_queries.fetch_items(session, bucket_list_id)
+    return [BucketItemResponse.model_validate(item) for item in items]
+
+
+def measure(Session, fn, bucket_list_id, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        session = Session()
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn(session, bucket_list_id)
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert result
+        session.close()
+    return min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", required=True)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, connect_args={"options": f"-csearch_path={DB_SCHEMA}"})
+    with engine.begin() as connection:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {DB_SCHEMA}"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as session:
+        bucket_list_id = seed(session, args.rows)
+
+    print(f"{args.rows} rows, best of {args.repeat} (timings include tracemalloc overhead)")
+    for name, fn in (("orm", orm_path), ("projected", projected_path)):
+        seconds, peak = measure(Session, fn, bucket_list_id, args.repeat)
+        print(f"{name:>10}: {seconds * 1000:8.1f} ms  peak {peak / 2 ** 20:7.1f} MiB")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
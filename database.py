@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, event, exc, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -15,13 +15,26 @@ DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 DB_SCHEMA = "bucket_list_app"
 
+# "psycopg2" (default) or "psycopg" (psycopg 3). psycopg 3 enables pipeline
+# mode (services/pipeline.py) and server-side prepared statements.
+DB_DRIVER = os.getenv("DB_DRIVER", "psycopg2")
+# psycopg 3 prepares a statement once it ran this many times on a connection.
+# Off ("none") by default: the Supabase pooler in transaction mode doesn't keep
+# server-side prepared statements. Only set a number (e.g. 5) when connecting
+# directly or through a session-mode pooler.
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "none")
+
 # Create database URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = f"postgresql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+connect_args = {"options": f"-csearch_path={DB_SCHEMA}"}
+if DB_DRIVER == "psycopg":
+    connect_args["prepare_threshold"] = None if DB_PREPARE_THRESHOLD == "none" else int(DB_PREPARE_THRESHOLD)
 
 # Create SQLAlchemy engine with explicit schema reference in connect_args
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"options": f"-csearch_path={DB_SCHEMA}"},
+    connect_args=connect_args,
     pool_pre_ping=True  # Helps detect stale connections
 )
 
@@ -33,6 +46,21 @@ def set_search_path(dbapi_connection, connection_record):
     dbapi_connection.commit()
     cursor.close()
 
+# Guard against pooled connections leaking across a fork (gunicorn workers)
+@event.listens_for(engine, "connect")
+def record_connection_pid(dbapi_connection, connection_record):
+    connection_record.info["pid"] = os.getpid()
+
+@event.listens_for(engine, "checkout")
+def check_connection_pid(dbapi_connection, connection_record, connection_proxy):
+    pid = os.getpid()
+    if connection_record.info["pid"] != pid:
+        connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+        raise exc.DisconnectionError(
+            f"Connection record belongs to pid {connection_record.info['pid']}, "
+            f"attempting to check out in pid {pid}"
+        )
+
 # Session setup
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -0,0 +1,74 @@
+import math
+import os
+import time
+
+# Production entry point: gunicorn -c gunicorn_conf.py main:app
+# Each worker runs its own uvicorn event loop, so bcrypt hashing no longer
+# pins a single core for the whole service.
+
+_config_loaded_at = time.perf_counter()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+
+def available_cpus() -> int:
+    """CPUs this container may use, not the host's count."""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        # cgroup v2, e.g. "200000 100000" for 2 CPUs, "max 100000" for no quota
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+    except OSError:
+        # cgroup v1, a quota of -1 means none
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = f.read().strip()
+        except OSError:
+            quota = period = "max"
+    if quota not in ("max", "-1"):
+        cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    return max(1, cpus)
+
+
+# Password hashing is CPU bound, so one worker per core is the sweet spot.
+# Every worker has its own SQLAlchemy pool (up to 15 connections) plus the
+# purge and history threads, so the count is capped by MAX_WORKERS to stay
+# within the database pooler's connection limit. WEB_CONCURRENCY overrides
+# the auto-sized value (Railway/Heroku convention).
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+workers = int(os.getenv("WEB_CONCURRENCY", min(available_cpus(), MAX_WORKERS)))
+
+# Cache invalidations can't reach other workers' in-process LRUs
+if workers > 1 and os.getenv("CACHE_URL", "none").startswith("memory://"):
+    raise RuntimeError("CACHE_URL=memory:// is per process, use a redis:// URL or none with several workers")
+
+# Import the app once in the master so workers start from a warm copy
+preload_app = True
+
+# Give in-flight requests time to drain on SIGTERM before workers are killed
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    server.log.info(
+        "Master ready in %.3fs with %d workers",
+        time.perf_counter() - _config_loaded_at,
+        workers,
+    )
+
+
+def post_fork(server, worker):
+    # The engine was created in the master by preload_app. Drop the pool
+    # inherited through fork without closing the parent's sockets, so every
+    # worker opens its own connections.
+    from database import engine
+
+    engine.dispose(close=False)
@@ -1,15 +1,39 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
+import os
 import random
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
+from fastapi import FastAPI, Depends, HTTPException
+from sqlalchemy.orm import Session
+
 from fastapi.middleware.cors import CORSMiddleware
 
 from database import get_db
 from models.bucket_list import BucketList
-from routes import account_routes, bucket_list_routes, bucket_item_routes
+from routes import account_routes, bucket_list_routes, bucket_item_routes, dashboard_routes, history_routes, \
+    maintenance_routes
+from services.item_history import history_writer
+from services.profiling import ProfilingMiddleware
+from services.purge_worker import PurgeWorker
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started per process, so it runs in every gunicorn worker after fork
+    purge_worker = None
+    if os.getenv("PURGE_WORKER_ENABLED", "1") == "1":
+        purge_worker = PurgeWorker()
+        purge_worker.start()
+    if os.getenv("HISTORY_ENABLED", "1") == "1":
+        history_writer.start()
+    yield
+    if purge_worker is not None:
+        purge_worker.stop()
+    # Flushes the events still buffered
+    history_writer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,8 +42,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Profile-Id"],
 )
 
+# Added last so it wraps everything, including CORS
+app.add_middleware(ProfilingMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -34,6 +62,9 @@ async def say_hello(name: str):
 app.include_router(account_routes.router)
 app.include_router(bucket_list_routes.router)
 app.include_router(bucket_item_routes.router)
+app.include_router(dashboard_routes.router)
+app.include_router(history_routes.router)
+app.include_router(maintenance_routes.router)
 
 @app.post("/bucket-list/test")
 async def create_test_bucket_list(title: str, db: Session = Depends(get_db)):
@@ -0,0 +1,7 @@
+-- Fractional-index ordering for bucket items.
+-- Afterwards, backfill existing rows with: python -m services.item_ordering
+ALTER TABLE bucket_list_app.bucket_item
+    ADD COLUMN IF NOT EXISTS position VARCHAR(255) COLLATE "C";
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bucket_item_list_position
+    ON bucket_list_app.bucket_item (bucket_list_id, position);
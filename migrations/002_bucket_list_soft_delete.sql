@@ -0,0 +1,6 @@
+-- Soft delete for bucket lists, purged by services/purge_worker.py
+ALTER TABLE bucket_list_app.bucket_list
+    ADD COLUMN IF NOT EXISTS date_deleted TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bucket_list_app_bucket_list_date_deleted
+    ON bucket_list_app.bucket_list (date_deleted);
@@ -0,0 +1,119 @@
+-- Hash partition bucket_item by bucket_list_id, online.
+--
+-- The new partitioned table is filled while the old one keeps serving
+-- traffic: a trigger mirrors every write, and a procedure copies existing
+-- rows in small committed batches. Only the final swap (step 4) takes an
+-- exclusive lock, and it's a few catalog renames.
+--
+-- Steps 1-4 are in this file, step 4 rolls back if the counts of both
+-- tables differ. Step 3 must be CALLed outside an explicit transaction
+-- block, it commits per batch. Step 5 drops the old table and is in
+-- 003_partition_bucket_item_cleanup.sql, run it once the new table has been
+-- serving for a while.
+
+-- 1. Partitioned table, same columns, primary key including the partition key
+CREATE TABLE bucket_list_app.bucket_item_new (
+    id INTEGER NOT NULL DEFAULT nextval('bucket_list_app.bucket_item_id_seq'),
+    bucket_list_id INTEGER NOT NULL REFERENCES bucket_list_app.bucket_list (id) ON DELETE CASCADE,
+    last_modified_by INTEGER,
+    date_last_modified TIMESTAMP WITH TIME ZONE,
+    content TEXT NOT NULL,
+    is_completed BOOLEAN,
+    position VARCHAR(255) COLLATE "C",
+    CONSTRAINT bucket_item_new_pkey PRIMARY KEY (bucket_list_id, id)
+) PARTITION BY HASH (bucket_list_id);
+
+-- Keep in sync with BUCKET_ITEM_PARTITIONS in models/bucket_list.py
+DO $$
+BEGIN
+    FOR remainder IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE TABLE bucket_list_app.bucket_item_p%s PARTITION OF bucket_list_app.bucket_item_new '
+            'FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+            remainder, remainder
+        );
+    END LOOP;
+END $$;
+
+CREATE INDEX ix_bucket_item_new_list_position
+    ON bucket_list_app.bucket_item_new (bucket_list_id, position);
+
+-- 2. Mirror writes on the old table into the new one
+CREATE FUNCTION bucket_list_app.mirror_bucket_item() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM bucket_list_app.bucket_item_new
+        WHERE bucket_list_id = OLD.bucket_list_id AND id = OLD.id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO bucket_list_app.bucket_item_new
+            (id, bucket_list_id, last_modified_by, date_last_modified, content, is_completed, position)
+        VALUES
+            (NEW.id, NEW.bucket_list_id, NEW.last_modified_by, NEW.date_last_modified, NEW.content,
+             NEW.is_completed, NEW.position)
+        ON CONFLICT (bucket_list_id, id) DO NOTHING;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER bucket_item_mirror
+    AFTER INSERT OR UPDATE OR DELETE ON bucket_list_app.bucket_item
+    FOR EACH ROW EXECUTE FUNCTION bucket_list_app.mirror_bucket_item();
+
+-- 3. Copy existing rows in id ranges. FOR SHARE holds off concurrent
+-- updates/deletes of a batch until it commits, after which the trigger
+-- replays them on the copied rows.
+CREATE PROCEDURE bucket_list_app.backfill_bucket_item(batch_size INTEGER DEFAULT 10000)
+LANGUAGE plpgsql AS $$
+DECLARE
+    last_id INTEGER := 0;
+    max_id INTEGER;
+BEGIN
+    SELECT coalesce(max(id), 0) INTO max_id FROM bucket_list_app.bucket_item;
+    WHILE last_id < max_id LOOP
+        INSERT INTO bucket_list_app.bucket_item_new
+            (id, bucket_list_id, last_modified_by, date_last_modified, content, is_completed, position)
+        SELECT id, bucket_list_id, last_modified_by, date_last_modified, content, is_completed, position
+        FROM bucket_list_app.bucket_item
+        WHERE id > last_id AND id <= last_id + batch_size
+        FOR SHARE
+        ON CONFLICT (bucket_list_id, id) DO NOTHING;
+        last_id := last_id + batch_size;
+        COMMIT;
+    END LOOP;
+END $$;
+
+CALL bucket_list_app.backfill_bucket_item();
+
+-- 4. Swap. The trigger keeps both tables equal from here on, so counting
+-- before the lock is enough. A mismatch aborts the transaction, nothing is
+-- renamed and the trigger stays in place.
+BEGIN;
+DO $$
+DECLARE
+    old_count BIGINT;
+    new_count BIGINT;
+BEGIN
+    SELECT (SELECT count(*) FROM bucket_list_app.bucket_item),
+           (SELECT count(*) FROM bucket_list_app.bucket_item_new)
+    INTO old_count, new_count;
+    IF old_count <> new_count THEN
+        RAISE EXCEPTION 'bucket_item has % rows, bucket_item_new has %, not swapping', old_count, new_count;
+    END IF;
+END $$;
+LOCK TABLE bucket_list_app.bucket_item IN ACCESS EXCLUSIVE MODE;
+DROP TRIGGER bucket_item_mirror ON bucket_list_app.bucket_item;
+ALTER TABLE bucket_list_app.bucket_item RENAME TO bucket_item_old;
+ALTER TABLE bucket_list_app.bucket_item_old RENAME CONSTRAINT bucket_item_pkey TO bucket_item_old_pkey;
+ALTER INDEX IF EXISTS bucket_list_app.ix_bucket_item_list_position RENAME TO ix_bucket_item_old_list_position;
+ALTER TABLE bucket_list_app.bucket_item_new RENAME TO bucket_item;
+ALTER TABLE bucket_list_app.bucket_item RENAME CONSTRAINT bucket_item_new_pkey TO bucket_item_pkey;
+ALTER TABLE bucket_list_app.bucket_item_old
+    RENAME CONSTRAINT bucket_item_bucket_list_id_fkey TO bucket_item_old_bucket_list_id_fkey;
+ALTER TABLE bucket_list_app.bucket_item
+    RENAME CONSTRAINT bucket_item_new_bucket_list_id_fkey TO bucket_item_bucket_list_id_fkey;
+ALTER INDEX bucket_list_app.ix_bucket_item_new_list_position RENAME TO ix_bucket_item_list_position;
+-- The sequence must not go away with the old table
+ALTER SEQUENCE bucket_list_app.bucket_item_id_seq OWNED BY bucket_list_app.bucket_item.id;
+COMMIT;
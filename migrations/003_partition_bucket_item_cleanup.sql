@@ -0,0 +1,6 @@
+-- 5. Clean up after 003_partition_bucket_item.sql, once the new table has
+-- been serving for a while. Keeping bucket_item_old until then allows going
+-- back by renaming it.
+DROP TABLE bucket_list_app.bucket_item_old;
+DROP PROCEDURE bucket_list_app.backfill_bucket_item(INTEGER);
+DROP FUNCTION bucket_list_app.mirror_bucket_item();
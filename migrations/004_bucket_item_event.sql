@@ -0,0 +1,15 @@
+-- Append-only item history, written by services/item_history.py
+CREATE TABLE IF NOT EXISTS bucket_list_app.bucket_item_event (
+    id BIGSERIAL PRIMARY KEY,
+    bucket_list_id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    action VARCHAR(16) NOT NULL,
+    account_id INTEGER NOT NULL,
+    date_created TIMESTAMP WITH TIME ZONE NOT NULL,
+    content TEXT,
+    is_completed BOOLEAN,
+    position VARCHAR(255) COLLATE "C"
+);
+
+CREATE INDEX IF NOT EXISTS ix_bucket_item_event_list_id
+    ON bucket_list_app.bucket_item_event (bucket_list_id, id);
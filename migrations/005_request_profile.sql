@@ -0,0 +1,16 @@
+-- Request profiles, shared by every app worker (services/profiling.py)
+CREATE TABLE IF NOT EXISTS bucket_list_app.request_profile (
+    id VARCHAR(32) PRIMARY KEY,
+    method VARCHAR(16) NOT NULL,
+    path TEXT NOT NULL,
+    trigger VARCHAR(16) NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    status_code INTEGER,
+    duration_ms DOUBLE PRECISION,
+    sample_count INTEGER NOT NULL,
+    sql_count INTEGER NOT NULL,
+    data JSON NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_bucket_list_app_request_profile_started_at
+    ON bucket_list_app.request_profile (started_at);
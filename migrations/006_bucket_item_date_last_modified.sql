@@ -0,0 +1,24 @@
+-- New items get a modification date, the dashboard's recent items sort on it
+ALTER TABLE bucket_list_app.bucket_item
+    ALTER COLUMN date_last_modified SET DEFAULT now();
+
+-- Backfill items that were never edited with their list's creation date,
+-- the closest known date. Commits every 1000 lists, so it must run outside
+-- an explicit transaction block.
+DO $$
+DECLARE
+    last_id INTEGER := 0;
+    max_id INTEGER;
+BEGIN
+    SELECT coalesce(max(id), 0) INTO max_id FROM bucket_list_app.bucket_list;
+    WHILE last_id < max_id LOOP
+        UPDATE bucket_list_app.bucket_item AS item
+        SET date_last_modified = list.date_created
+        FROM bucket_list_app.bucket_list AS list
+        WHERE item.bucket_list_id = list.id
+          AND list.id > last_id AND list.id <= last_id + 1000
+          AND item.date_last_modified IS NULL;
+        last_id := last_id + 1000;
+        COMMIT;
+    END LOOP;
+END $$;
@@ -0,0 +1,12 @@
+-- Counters of the background workers, shared by every app process
+-- (services/worker_status.py)
+CREATE TABLE IF NOT EXISTS bucket_list_app.worker_status (
+    component VARCHAR(16) NOT NULL,
+    worker VARCHAR(128) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    data JSON NOT NULL,
+    PRIMARY KEY (component, worker)
+);
+
+CREATE INDEX IF NOT EXISTS ix_bucket_list_app_worker_status_updated_at
+    ON bucket_list_app.worker_status (updated_at);
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, ForeignKey, DateTime, Index, DDL, PrimaryKeyConstraint, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -15,29 +15,52 @@ class BucketList(Base):
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     is_private = Column(Boolean, default=True)
     share_token = Column(String(64), unique=True)
+    # Set on delete, the row and its items are purged in the background
+    date_deleted = Column(DateTime(timezone=True), index=True)
 
     # Relationship with BucketItem
-    items = relationship("BucketItem", back_populates="bucket_list", cascade="all, delete-orphan")
+    items = relationship("BucketItem", back_populates="bucket_list", cascade="all, delete-orphan",
+                         order_by="(BucketItem.position, BucketItem.id)")
 
     # Relationship with BucketListCollaborator
     collaborators = relationship("BucketListCollaborator", back_populates="bucket_list")
 
+# Number of hash partitions of bucket_item, see migrations/003_partition_bucket_item.sql
+BUCKET_ITEM_PARTITIONS = 16
+
 # Define BucketItem model second
 class BucketItem(Base):
     __tablename__ = "bucket_item"
-    __table_args__ = {"schema": "bucket_list_app"}
+    # Hash partitioned by list: every item query filters on bucket_list_id, so
+    # it only touches one partition. Postgres needs the partition key in the
+    # primary key, hence (bucket_list_id, id).
+    __table_args__ = (
+        PrimaryKeyConstraint("bucket_list_id", "id"),
+        Index("ix_bucket_item_list_position", "bucket_list_id", "position"),
+        {"schema": "bucket_list_app", "postgresql_partition_by": "HASH (bucket_list_id)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    bucket_list_id = Column(Integer, ForeignKey("bucket_list_app.bucket_list.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, autoincrement=True)
+    bucket_list_id = Column(Integer, ForeignKey("bucket_list_app.bucket_list.id", ondelete="CASCADE"), nullable=False)
     last_modified_by = Column(Integer)
-    date_last_modified = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set on insert too, so new items rank as recently modified (dashboard)
+    date_last_modified = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     content = Column(Text, nullable=False)
     is_completed = Column(Boolean, default=False)
+    # Fractional index key (see services/item_ordering.py), compared byte-wise
+    position = Column(String(255, collation="C"))
 
     # Relationship with BucketList
     bucket_list = relationship("BucketList", back_populates="items")
 
 
+for remainder in range(BUCKET_ITEM_PARTITIONS):
+    event.listen(BucketItem.__table__, "after_create", DDL(
+        f"CREATE TABLE bucket_list_app.bucket_item_p{remainder} PARTITION OF bucket_list_app.bucket_item "
+        f"FOR VALUES WITH (MODULUS {BUCKET_ITEM_PARTITIONS}, REMAINDER {remainder})"
+    ).execute_if(dialect="postgresql"))
+
+
 class BucketListCollaborator(Base):
     __tablename__ = "bucket_list_collaborator"
     __table_args__ = {"schema": "bucket_list_app"}
@@ -51,4 +74,26 @@ class BucketListCollaborator(Base):
 
     # Change backref to back_populates
     bucket_list = relationship("BucketList", back_populates="collaborators")
-    collaborator = relationship("Account", back_populates="collaborated_bucket_lists")
\ No newline at end of file
+    collaborator = relationship("Account", back_populates="collaborated_bucket_lists")
+
+
+class BucketItemEvent(Base):
+    __tablename__ = "bucket_item_event"
+    # Append-only. Rows are written in batches by services/item_history.py
+    # after the change they describe has committed, so there are no foreign
+    # keys: the item (or list) may be gone by the time its event lands.
+    __table_args__ = (
+        Index("ix_bucket_item_event_list_id", "bucket_list_id", "id"),
+        {"schema": "bucket_list_app"},
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    bucket_list_id = Column(Integer, nullable=False)
+    item_id = Column(Integer, nullable=False)
+    action = Column(String(16), nullable=False)
+    account_id = Column(Integer, nullable=False)
+    date_created = Column(DateTime(timezone=True), nullable=False)
+    # Item state after the change (before it, for deletes)
+    content = Column(Text)
+    is_completed = Column(Boolean)
+    position = Column(String(255, collation="C"))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON
+from database import Base
+
+
+class RequestProfileRecord(Base):
+    __tablename__ = "request_profile"
+    # Written by services/profiling.py, so every worker can serve every profile
+    __table_args__ = {"schema": "bucket_list_app"}
+
+    id = Column(String(32), primary_key=True)
+    method = Column(String(16), nullable=False)
+    path = Column(Text, nullable=False)
+    trigger = Column(String(16), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    status_code = Column(Integer)
+    duration_ms = Column(Float)
+    sample_count = Column(Integer, nullable=False)
+    sql_count = Column(Integer, nullable=False)
+    # Full profile: summary, flame graph lines and SQL timeline
+    data = Column(JSON, nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, JSON, PrimaryKeyConstraint
+from database import Base
+
+
+class WorkerStatusRecord(Base):
+    __tablename__ = "worker_status"
+    # Written by services/worker_status.py, one row per process and component
+    __table_args__ = (
+        PrimaryKeyConstraint("component", "worker"),
+        {"schema": "bucket_list_app"},
+    )
+
+    component = Column(String(16), nullable=False)
+    # "host:pid" of the process
+    worker = Column(String(128), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # The process's counters, as returned by its snapshot function
+    data = Column(JSON, nullable=False)
@@ -56,6 +56,9 @@ class AccountUpdate(BaseModel):
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 
+# Accounts allowed to use the maintenance and profiling endpoints
+ADMIN_ACCOUNT_IDS = {int(account_id) for account_id in os.getenv("ADMIN_ACCOUNT_IDS", "").split(",") if account_id}
+
 
 # Helper functions
 def verify_password(plain_password, hashed_password):
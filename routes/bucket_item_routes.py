@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Path
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from database import get_db
-from models.bucket_list import BucketList, BucketItem, BucketListCollaborator
+from models.bucket_list import BucketList, BucketItem
 from routes.bucket_list_routes import get_current_user_id, BucketItemResponse
 from routes.account_routes import oauth2_scheme
+from services import read_queries
+from services.cache import invalidate_bucket_list
+from services.item_history import history_writer
+from services.item_ordering import (
+    key_between, lock_list_order, rebalance_positions, rebalance_positions_task, MAX_POSITION_LENGTH
+)
 
 # Create the router
 router = APIRouter(
@@ -19,6 +26,9 @@ router = APIRouter(
 
 class BucketItemCreate(BaseModel):
     content: str
+    # Optional neighbours, the item is appended at the end when both are omitted
+    previous_item_id: Optional[int] = None
+    next_item_id: Optional[int] = None
 
 
 class BucketItemUpdate(BaseModel):
@@ -26,33 +36,22 @@ class BucketItemUpdate(BaseModel):
     is_completed: bool = None
 
 
+class BucketItemMove(BaseModel):
+    previous_item_id: Optional[int] = None
+    next_item_id: Optional[int] = None
+
+
 # Helper Functions
 def verify_bucket_list_access(bucket_list_id: int, user_id: int, db: Session):
     """Verify that the user either owns or collaborates on the bucket list."""
-    # First check if user is the owner
+    # Owner and collaborator checks in a single round trip
     bucket_list = db.query(BucketList).filter(
-        BucketList.id == bucket_list_id,
-        BucketList.created_by == user_id
+        *read_queries.accessible_criteria(bucket_list_id, user_id)
     ).first()
 
     if bucket_list:
         return bucket_list
 
-    # If not the owner, check if user is a collaborator
-    collaborator = db.query(BucketListCollaborator).filter(
-        BucketListCollaborator.bucket_list_id == bucket_list_id,
-        BucketListCollaborator.account_id == user_id
-    ).first()
-
-    # If user is a collaborator, get the bucket list
-    if collaborator:
-        bucket_list = db.query(BucketList).filter(
-            BucketList.id == bucket_list_id
-        ).first()
-
-        if bucket_list:
-            return bucket_list
-
     # If neither owner nor collaborator
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -61,16 +60,19 @@ def verify_bucket_list_access(bucket_list_id: int, user_id: int, db: Session):
 
 
 def return_item(user_id, item_id, bucket_list_id, db):
-    # Verify access (either owner or collaborator)
-    verify_bucket_list_access(bucket_list_id, user_id, db)
-
-    # Get item
-    item = db.query(BucketItem).filter(
+    # Get item, verifying access (either owner or collaborator) in the same query
+    item = db.query(BucketItem).join(
+        BucketList,
+        BucketList.id == BucketItem.bucket_list_id
+    ).filter(
+        BucketItem.bucket_list_id == bucket_list_id,  # Partition key, keeps the lookup on one partition
         BucketItem.id == item_id,
-        BucketItem.bucket_list_id == bucket_list_id
+        *read_queries.accessible_criteria(bucket_list_id, user_id)
     ).first()
 
     if item is None:
+        # Tell a missing list apart from a missing item
+        verify_bucket_list_access(bucket_list_id, user_id, db)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Bucket item not found"
@@ -79,11 +81,96 @@ def return_item(user_id, item_id, bucket_list_id, db):
     return item
 
 
+def get_item_position(bucket_list_id: int, item_id: int, db: Session):
+    item = db.query(BucketItem.id, BucketItem.position).filter(
+        BucketItem.id == item_id,
+        BucketItem.bucket_list_id == bucket_list_id
+    ).first()
+
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Neighbouring bucket item not found"
+        )
+    if item.position is None:
+        # Not backfilled yet (python -m services.item_ordering), None would
+        # read as the start or end of the list
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Item order of this list is not set up yet, try again later"
+        )
+
+    return item.position
+
+
+def compute_position(bucket_list_id: int, previous_item_id: Optional[int], next_item_id: Optional[int],
+                     db: Session, exclude_item_id: Optional[int] = None):
+    """Compute a position key placing an item between the given neighbours.
+
+    Only one neighbour is needed, the other one is looked up through the
+    (bucket_list_id, position) index. With no neighbour the item goes last.
+    Holds the list's order lock until the caller commits.
+    """
+    if previous_item_id is not None and previous_item_id == next_item_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="previous_item_id and next_item_id must be different items"
+        )
+
+    lock_list_order(db, bucket_list_id)
+
+    others = db.query(BucketItem.position).filter(
+        BucketItem.bucket_list_id == bucket_list_id,
+        BucketItem.position.isnot(None)
+    )
+    if exclude_item_id is not None:
+        others = others.filter(BucketItem.id != exclude_item_id)
+
+    before = after = None
+    if previous_item_id is not None:
+        before = get_item_position(bucket_list_id, previous_item_id, db)
+    if next_item_id is not None:
+        after = get_item_position(bucket_list_id, next_item_id, db)
+
+    if previous_item_id is None and next_item_id is None:
+        before = others.with_entities(func.max(BucketItem.position)).scalar()
+    elif next_item_id is None:
+        after = others.filter(BucketItem.position > before).order_by(BucketItem.position).limit(1).scalar()
+    elif previous_item_id is None:
+        before = others.filter(BucketItem.position < after).order_by(BucketItem.position.desc()).limit(1).scalar()
+
+    if before is not None and before == after:
+        # Two items share a key (written before the order lock existed).
+        # Rebalance right away, under the lock we hold, so the retry after a
+        # reload succeeds. Background tasks don't run on errors.
+        rebalance_positions(db, bucket_list_id)
+        invalidate_bucket_list(bucket_list_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Item order changed, reload the list and try again"
+        )
+
+    try:
+        return key_between(before, after)
+    except ValueError:
+        # Neighbours swapped or moved in the meantime, nothing is written
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Item order changed, reload the list and try again"
+        )
+
+
+def schedule_rebalance(position: str, bucket_list_id: int, background_tasks: BackgroundTasks):
+    if len(position) > MAX_POSITION_LENGTH:
+        background_tasks.add_task(rebalance_positions_task, bucket_list_id)
+
+
 # Routes
 @router.post("", response_model=BucketItemResponse, status_code=status.HTTP_201_CREATED)
 def create_bucket_item(
         token: Annotated[str, Depends(oauth2_scheme)],
         bucket_item: BucketItemCreate,
+        background_tasks: BackgroundTasks,
         bucket_list_id: int = Path(...),
         db: Session = Depends(get_db)
 ):
@@ -92,17 +179,25 @@ def create_bucket_item(
     # Verify access
     verify_bucket_list_access(bucket_list_id, user_id, db)
 
+    position = compute_position(bucket_list_id, bucket_item.previous_item_id, bucket_item.next_item_id, db)
+
     # Create bucket item
     db_bucket_item = BucketItem(
         bucket_list_id=bucket_list_id,
         content=bucket_item.content,
-        last_modified_by=user_id
+        last_modified_by=user_id,
+        position=position
     )
 
     db.add(db_bucket_item)
     db.commit()
     db.refresh(db_bucket_item)
 
+    invalidate_bucket_list(bucket_list_id)
+    history_writer.record(db_bucket_item, "created", user_id)
+
+    schedule_rebalance(position, bucket_list_id, background_tasks)
+
     return db_bucket_item
 
 
@@ -115,14 +210,14 @@ def get_bucket_items(
     user_id = get_current_user_id(token)
 
     # Verify access
-    verify_bucket_list_access(bucket_list_id, user_id, db)
-
-    # Get items
-    items = db.query(BucketItem).filter(
-        BucketItem.bucket_list_id == bucket_list_id
-    ).all()
+    if not read_queries.has_bucket_list_access(db, bucket_list_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bucket list not found or you don't have access"
+        )
 
-    return items
+    # Get items in list order, served by the (bucket_list_id, position) index
+    return read_queries.fetch_items(db, bucket_list_id)
 
 
 @router.put("/{item_id}", response_model=BucketItemResponse)
@@ -150,6 +245,55 @@ def update_bucket_item(
     db.commit()
     db.refresh(item)
 
+    invalidate_bucket_list(bucket_list_id)
+    history_writer.record(item, "updated", user_id)
+
+    return item
+
+
+@router.put("/{item_id}/move", response_model=BucketItemResponse)
+def move_bucket_item(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        bucket_item_move: BucketItemMove,
+        background_tasks: BackgroundTasks,
+        item_id: int = Path(...),
+        bucket_list_id: int = Path(...),
+        db: Session = Depends(get_db)
+):
+    user_id = get_current_user_id(token)
+
+    if bucket_item_move.previous_item_id is None and bucket_item_move.next_item_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="previous_item_id or next_item_id is required"
+        )
+    if item_id in (bucket_item_move.previous_item_id, bucket_item_move.next_item_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="An item cannot be moved next to itself"
+        )
+
+    item = return_item(user_id, item_id, bucket_list_id, db)
+
+    # Only the moved row is written, its neighbours keep their keys
+    item.position = compute_position(
+        bucket_list_id,
+        bucket_item_move.previous_item_id,
+        bucket_item_move.next_item_id,
+        db,
+        exclude_item_id=item_id
+    )
+    item.last_modified_by = user_id
+    item.date_last_modified = datetime.now()
+
+    db.commit()
+    db.refresh(item)
+
+    invalidate_bucket_list(bucket_list_id)
+    history_writer.record(item, "moved", user_id)
+
+    schedule_rebalance(item.position, bucket_list_id, background_tasks)
+
     return item
 
 
@@ -167,6 +311,10 @@ def delete_bucket_item(
     db.delete(item)
     db.commit()
 
+    invalidate_bucket_list(bucket_list_id)
+    # The deleted instance keeps the state it was loaded with
+    history_writer.record(item, "deleted", user_id)
+
     return None
 
 
@@ -191,4 +339,7 @@ def toggle_bucket_item_completion(
     db.commit()
     db.refresh(item)
 
+    invalidate_bucket_list(bucket_list_id)
+    history_writer.record(item, "toggled", user_id)
+
     return item
\ No newline at end of file
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from sqlalchemy import false, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from typing import Annotated, List, Optional
 import uuid
@@ -9,6 +10,10 @@ from datetime import datetime
 from database import get_db
 from models.bucket_list import BucketList, BucketListCollaborator
 from routes.account_routes import oauth2_scheme, SECRET_KEY, ALGORITHM
+from services import read_queries
+from services.cache import bucket_list_cache, share_token_key, get_or_load_bucket_list, invalidate_bucket_list
+from services.cloning import clone_bucket_list
+from services.pipeline import execute_pipelined
 import jwt
 
 # Create the router
@@ -27,6 +32,7 @@ class BucketItemResponse(BaseModel):
     is_completed: bool
     last_modified_by: int
     date_last_modified: Optional[datetime] = None
+    position: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -57,6 +63,40 @@ class BucketListResponse(BaseModel):
         from_attributes = True
 
 
+class BucketListClone(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+
+
+class BucketListCloneResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    created_by: int
+    date_created: datetime
+    is_private: bool
+    item_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class CollaboratorResponse(BaseModel):
+    account_id: int
+    username: str
+    is_owner: bool
+    access_date: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CollaboratorPage(BaseModel):
+    total: int
+    skip: int
+    limit: int
+    collaborators: List[CollaboratorResponse] = []
+
+
 # Helper Functions
 def get_current_user_id(token: str) -> int:
     """Get the user ID from the JWT token."""
@@ -83,29 +123,13 @@ def generate_share_token():
 
 def verify_bucket_list_access(bucket_list_id: int, user_id: int, db: Session):
     """Verify that the user either owns or collaborates on the bucket list."""
-    # First check if user is the owner
+    # Owner and collaborator checks in a single round trip
     bucket_list = db.query(BucketList).filter(
-        BucketList.id == bucket_list_id,
-        BucketList.created_by == user_id
+        *read_queries.accessible_criteria(bucket_list_id, user_id)
     ).first()
 
     if bucket_list:
-        return bucket_list, True  # Return bucket list and is_owner=True
-
-    # If not the owner, check if user is a collaborator
-    collaborator = db.query(BucketListCollaborator).filter(
-        BucketListCollaborator.bucket_list_id == bucket_list_id,
-        BucketListCollaborator.account_id == user_id
-    ).first()
-
-    # If user is a collaborator, get the bucket list
-    if collaborator:
-        bucket_list = db.query(BucketList).filter(
-            BucketList.id == bucket_list_id
-        ).first()
-
-        if bucket_list:
-            return bucket_list, False  # Return bucket list and is_owner=False
+        return bucket_list, bucket_list.created_by == user_id  # Return bucket list and is_owner
 
     # If neither owner nor collaborator
     raise HTTPException(
@@ -114,6 +138,11 @@ def verify_bucket_list_access(bucket_list_id: int, user_id: int, db: Session):
     )
 
 
+def bucket_list_document(bucket_list: BucketList):
+    """Serialize a list with its items, the form kept in the cache."""
+    return BucketListResponse.model_validate(bucket_list).model_dump(mode="json")
+
+
 # Routes
 @router.post("", response_model=BucketListResponse, status_code=status.HTTP_201_CREATED)
 def create_bucket_list(
@@ -145,17 +174,8 @@ def get_bucket_lists(
 ):
     user_id = get_current_user_id(token)
 
-    # Get bucket lists created by the user
-    owned_bucket_lists = db.query(BucketList).filter(
-        BucketList.created_by == user_id
-    ).all()
-
-    all_bucket_lists = owned_bucket_lists
-
-    # Apply pagination (simple approach)
-    paginated_lists = all_bucket_lists[skip:skip + limit]
-
-    return paginated_lists
+    # Get bucket lists created by the user, paginated in SQL
+    return read_queries.fetch_owned_bucket_lists(db, user_id, skip, limit)
 
 @router.get("/collaborated", response_model=List[BucketListResponse])
 def get_collaborated_bucket_lists(
@@ -166,18 +186,8 @@ def get_collaborated_bucket_lists(
 ):
     user_id = get_current_user_id(token)
 
-    # Get bucket lists the user collaborates on
-    collaborated_lists = db.query(BucketList).join(
-        BucketListCollaborator,
-        BucketListCollaborator.bucket_list_id == BucketList.id
-    ).filter(
-        BucketListCollaborator.account_id == user_id
-    ).all()
-
-    # Apply pagination (simple approach)
-    paginated_lists = collaborated_lists[skip:skip + limit]
-
-    return paginated_lists
+    # Get bucket lists the user collaborates on, paginated in SQL
+    return read_queries.fetch_collaborated_bucket_lists(db, user_id, skip, limit)
 
 
 @router.get("/{bucket_list_id}", response_model=BucketListResponse)
@@ -188,10 +198,21 @@ def get_bucket_list(
 ):
     user_id = get_current_user_id(token)
 
-    # Verify access (returns bucket list or raises exception)
-    bucket_list, _ = verify_bucket_list_access(bucket_list_id, user_id, db)
+    # Verify access, owner or collaborator, in a single query
+    bucket_list = read_queries.fetch_accessible_bucket_list(db, bucket_list_id, user_id)
 
-    return bucket_list
+    if bucket_list is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bucket list not found or you don't have access"
+        )
+
+    # Items are only loaded on a cache miss
+    def load_bucket_list():
+        bucket_list.items = read_queries.fetch_items(db, bucket_list_id)
+        return bucket_list_document(bucket_list)
+
+    return get_or_load_bucket_list(bucket_list_id, load_bucket_list)
 
 
 @router.put("/{bucket_list_id}", response_model=BucketListResponse)
@@ -203,26 +224,47 @@ def update_bucket_list(
 ):
     user_id = get_current_user_id(token)
 
-    # Verify access (returns bucket list or raises exception)
-    bucket_list, is_owner = verify_bucket_list_access(bucket_list_id, user_id, db)
+    # The access check is part of the update: only the owner may change
+    # is_private, any collaborator the other fields
+    criteria = read_queries.accessible_criteria(bucket_list_id, user_id)
+    if bucket_list_update.is_private is not None:
+        criteria += (BucketList.created_by == user_id,)
 
-    # Only allow is_private updates for owners
-    if bucket_list_update.is_private is not None and not is_owner:
+    # Update fields if provided
+    changes = {}
+    if bucket_list_update.title is not None:
+        changes["title"] = bucket_list_update.title
+    if bucket_list_update.description is not None:
+        changes["description"] = bucket_list_update.description
+    if bucket_list_update.is_private is not None:
+        changes["is_private"] = bucket_list_update.is_private
+
+    if changes:
+        statement = update(BucketList).where(*criteria).values(changes).returning(*read_queries.LIST_COLUMNS)
+    else:
+        statement = select(*read_queries.LIST_COLUMNS).where(*criteria)
+
+    # Update and item read go out in a single flush
+    list_rows, item_rows = execute_pipelined(db, [
+        statement,
+        read_queries.items_select(bucket_list_id)
+    ])
+
+    if not list_rows:
+        db.rollback()
+        # Tell a missing list apart from a collaborator changing privacy
+        verify_bucket_list_access(bucket_list_id, user_id, db)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can change privacy settings"
         )
 
-    # Update fields if provided
-    if bucket_list_update.title is not None:
-        bucket_list.title = bucket_list_update.title
-    if bucket_list_update.description is not None:
-        bucket_list.description = bucket_list_update.description
-    if bucket_list_update.is_private is not None and is_owner:
-        bucket_list.is_private = bucket_list_update.is_private
-
     db.commit()
-    db.refresh(bucket_list)
+
+    bucket_list = read_queries.BucketListRecord(
+        list_rows[0], [read_queries.BucketItemRecord(row) for row in item_rows]
+    )
+    invalidate_bucket_list(bucket_list.id, bucket_list.share_token)
 
     return bucket_list
 
@@ -238,7 +280,8 @@ def delete_bucket_list(
     # Only the creator can delete a bucket list
     bucket_list = db.query(BucketList).filter(
         BucketList.id == bucket_list_id,
-        BucketList.created_by == user_id
+        BucketList.created_by == user_id,
+        BucketList.date_deleted.is_(None)
     ).first()
 
     if bucket_list is None:
@@ -247,9 +290,13 @@ def delete_bucket_list(
             detail="Bucket list not found or you are not the owner"
         )
 
-    db.delete(bucket_list)
+    # Soft delete, the list disappears from every query right away and
+    # services/purge_worker.py removes its items in batches later on
+    bucket_list.date_deleted = func.now()
     db.commit()
 
+    invalidate_bucket_list(bucket_list.id, bucket_list.share_token)
+
     return None
 
 
@@ -264,7 +311,8 @@ def share_bucket_list(
     # Only the creator can share a bucket list
     bucket_list = db.query(BucketList).filter(
         BucketList.id == bucket_list_id,
-        BucketList.created_by == user_id
+        BucketList.created_by == user_id,
+        BucketList.date_deleted.is_(None)
     ).first()
 
     if bucket_list is None:
@@ -280,6 +328,8 @@ def share_bucket_list(
         db.commit()
         db.refresh(bucket_list)
 
+        invalidate_bucket_list(bucket_list.id)
+
     return bucket_list
 
 
@@ -294,7 +344,8 @@ def unshare_bucket_list(
     # Only the creator can unshare a bucket list
     bucket_list = db.query(BucketList).filter(
         BucketList.id == bucket_list_id,
-        BucketList.created_by == user_id
+        BucketList.created_by == user_id,
+        BucketList.date_deleted.is_(None)
     ).first()
 
     if bucket_list is None:
@@ -304,14 +355,84 @@ def unshare_bucket_list(
         )
 
     # Remove share token and make private
+    old_share_token = bucket_list.share_token
     bucket_list.share_token = None
     bucket_list.is_private = True
     db.commit()
     db.refresh(bucket_list)
 
+    invalidate_bucket_list(bucket_list.id, old_share_token)
+
     return bucket_list
 
 
+@router.post("/{bucket_list_id}/clone", response_model=BucketListCloneResponse, status_code=status.HTTP_201_CREATED)
+def clone_accessible_bucket_list(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        bucket_list_clone: Optional[BucketListClone] = None,
+        bucket_list_id: int = Path(...),
+        db: Session = Depends(get_db)
+):
+    user_id = get_current_user_id(token)
+
+    # The access check is part of the clone statement, no rows means no access
+    clone = clone_bucket_list(
+        db,
+        bucket_list_id,
+        user_id,
+        read_queries.accessible_criteria(bucket_list_id, user_id),
+        bucket_list_clone.title if bucket_list_clone else None
+    )
+
+    if clone is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bucket list not found or you don't have access"
+        )
+
+    db.commit()
+
+    return clone
+
+
+@router.post("/shared/{share_token}/clone", response_model=BucketListCloneResponse,
+             status_code=status.HTTP_201_CREATED)
+def clone_shared_bucket_list(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        bucket_list_clone: Optional[BucketListClone] = None,
+        share_token: str = Path(...),
+        db: Session = Depends(get_db)
+):
+    user_id = get_current_user_id(token)
+
+    # Resolve the share token, same cache entry as get_shared_bucket_list
+    bucket_list_id = bucket_list_cache.get_or_load(
+        share_token_key(share_token),
+        lambda: read_queries.fetch_shared_bucket_list_id(db, share_token)
+    )
+
+    clone = None
+    if bucket_list_id is not None:
+        # Checked again in the statement, the cached token may be stale
+        clone = clone_bucket_list(
+            db,
+            bucket_list_id,
+            user_id,
+            read_queries.shared_criteria(share_token),
+            bucket_list_clone.title if bucket_list_clone else None
+        )
+
+    if clone is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shared bucket list not found or no longer available"
+        )
+
+    db.commit()
+
+    return clone
+
+
 @router.get("/shared/{share_token}", response_model=BucketListResponse)
 def get_shared_bucket_list(
         token: Annotated[str, Depends(oauth2_scheme)],
@@ -321,73 +442,119 @@ def get_shared_bucket_list(
     # Check if the user is authenticated
     user_id = get_current_user_id(token)
 
-    # First get the shared bucket list
-    bucket_list = db.query(BucketList).filter(
-        BucketList.share_token == share_token,
-        BucketList.is_private == False
-    ).first()
+    # First resolve the share token, cached as token -> list id
+    bucket_list_id = bucket_list_cache.get_or_load(
+        share_token_key(share_token),
+        lambda: read_queries.fetch_shared_bucket_list_id(db, share_token)
+    )
 
-    if bucket_list is None:
+    if bucket_list_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shared bucket list not found or no longer available"
         )
 
-    # Add or update the user as a collaborator
+    # Add the user as a collaborator, or update their access date. The
+    # insert selects from the live list row, so a stale cached token (list
+    # made private or deleted since, possibly by another worker) adds no
+    # row and returns nothing.
+    add_collaborator = insert(BucketListCollaborator).from_select(
+        ["bucket_list_id", "account_id", "is_owner", "access_date"],
+        select(
+            BucketList.id,
+            literal(user_id),
+            false(),
+            func.now()  # Set current timestamp
+        ).where(
+            BucketList.id == bucket_list_id,
+            *read_queries.shared_criteria(share_token)
+        )
+    ).on_conflict_do_update(
+        index_elements=[BucketListCollaborator.bucket_list_id, BucketListCollaborator.account_id],
+        set_={"access_date": func.now()}
+    ).returning(BucketListCollaborator.bucket_list_id)
+    collaborator_rows = None
+
+    def load_shared_bucket_list():
+        # On a cache miss the upsert and both reads go out in a single flush
+        nonlocal collaborator_rows
+        collaborator_rows, list_rows, item_rows = execute_pipelined(db, [
+            add_collaborator,
+            read_queries.bucket_list_select(bucket_list_id),
+            read_queries.items_select(bucket_list_id)
+        ])
+        if not collaborator_rows or not list_rows:
+            return None
+        items = [read_queries.BucketItemRecord(row) for row in item_rows]
+        return bucket_list_document(read_queries.BucketListRecord(list_rows[0], items))
+
+    def load_shared_bucket_list_only():
+        bucket_list = read_queries.fetch_bucket_list_with_items(db, bucket_list_id)
+        return bucket_list_document(bucket_list) if bucket_list else None
+
     try:
-        # Check if the user is already a collaborator
-        collaborator = db.query(BucketListCollaborator).filter(
-            BucketListCollaborator.bucket_list_id == bucket_list.id,
-            BucketListCollaborator.account_id == user_id
-        ).first()
-
-        if collaborator is None:
-            # Add as a new collaborator
-            db_collaborator = BucketListCollaborator(
-                bucket_list_id=bucket_list.id,
-                account_id=user_id,
-                is_owner=False,
-                access_date=func.now()  # Set current timestamp
-            )
-            db.add(db_collaborator)
+        document = get_or_load_bucket_list(bucket_list_id, load_shared_bucket_list)
+        if collaborator_rows is None:
+            collaborator_rows = db.execute(add_collaborator).all()
+        if collaborator_rows:
+            db.commit()
         else:
-            # Update access date for existing collaborator
-            collaborator.access_date = func.now()
-
-        db.commit()
+            db.rollback()
+            document = None
 
     except Exception as e:
         # Log the error but don't fail the request
         print(f"Error adding collaborator: {str(e)}")
         db.rollback()
-        # Continue to return the bucket list even if adding collaborator fails
+        # Continue to return the bucket list even if adding collaborator
+        # fails, after checking the share state without the cache
+        document = None
+        if read_queries.fetch_shared_bucket_list_id(db, share_token) == bucket_list_id:
+            document = get_or_load_bucket_list(bucket_list_id, load_shared_bucket_list_only)
+
+    if document is None:
+        # Drop a stale token mapping, if this process had one
+        bucket_list_cache.delete(share_token_key(share_token))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shared bucket list not found or no longer available"
+        )
 
-    return bucket_list
+    return document
 
 
-@router.get("/{bucket_list_id}/collaborators", response_model=List[dict])
+@router.get("/{bucket_list_id}/collaborators", response_model=CollaboratorPage)
 def get_bucket_list_collaborators(
         token: Annotated[str, Depends(oauth2_scheme)],
         bucket_list_id: int = Path(...),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=100),
         db: Session = Depends(get_db)
 ):
     user_id = get_current_user_id(token)
 
     # Verify access
-    bucket_list, _ = verify_bucket_list_access(bucket_list_id, user_id, db)
-
-    # Get collaborators
-    collaborators = db.query(BucketListCollaborator).filter(
-        BucketListCollaborator.bucket_list_id == bucket_list_id
-    ).all()
-
-    # Transform to response format
-    result = []
-    for collab in collaborators:
-        result.append({
-            "account_id": collab.account_id,
-            "is_owner": collab.is_owner,
-            "access_date": collab.access_date
-        })
-
-    return result
\ No newline at end of file
+    if not read_queries.has_bucket_list_access(db, bucket_list_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bucket list not found or you don't have access"
+        )
+
+    # One query for the page, the account info and the total (window count).
+    # This covers every row get_shared_bucket_list created for the list.
+    rows = read_queries.fetch_collaborators(db, bucket_list_id, skip, limit)
+
+    if rows:
+        total = rows[0].total
+    elif skip == 0:
+        total = 0
+    else:
+        # Page past the end, the window count has no row to ride on
+        total = read_queries.count_collaborators(db, bucket_list_id)
+
+    return {
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "collaborators": rows
+    }
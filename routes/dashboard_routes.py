@@ -0,0 +1,147 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, or_, case, select
+from sqlalchemy.orm import Session
+from typing import Annotated, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from database import get_db
+from models.account import Account
+from models.bucket_list import BucketList, BucketItem, BucketListCollaborator
+from routes.account_routes import oauth2_scheme, AccountResponse
+from routes.bucket_list_routes import get_current_user_id, BucketItemResponse
+from services import read_queries
+
+# Create the router
+router = APIRouter(
+    prefix="/api/dashboard",
+    tags=["dashboard"],
+    responses={404: {"description": "Not found"}}
+)
+
+# Query budget for GET /api/dashboard, independent of how many lists or
+# items the user has:
+#   1. SET search_path, run by get_db on every request
+#   2. account profile
+#   3. owned + collaborated lists with their item counts
+#   4. most recently modified items across those lists
+DASHBOARD_QUERY_BUDGET = 4
+
+
+class DashboardBucketListResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    created_by: int
+    date_created: datetime
+    is_private: bool
+    share_token: Optional[str] = None
+    item_count: int
+    completed_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class DashboardResponse(BaseModel):
+    account: AccountResponse
+    owned_bucket_lists: List[DashboardBucketListResponse] = []
+    collaborated_bucket_lists: List[DashboardBucketListResponse] = []
+    recent_items: List[BucketItemResponse] = []
+
+
+def accessible_bucket_list_ids(user_id: int):
+    """Subquery of every bucket list id the user owns or collaborates on."""
+    collaborated = select(BucketListCollaborator.bucket_list_id).where(
+        BucketListCollaborator.account_id == user_id
+    )
+    return select(BucketList.id).where(
+        or_(BucketList.created_by == user_id, BucketList.id.in_(collaborated)),
+        BucketList.date_deleted.is_(None)
+    )
+
+
+@router.get("", response_model=DashboardResponse)
+def get_dashboard(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        lists_limit: int = Query(100, ge=1, le=500),
+        recent_items_limit: int = Query(10, ge=0, le=100),
+        db: Session = Depends(get_db)
+):
+    user_id = get_current_user_id(token)
+
+    # Query 2: account profile
+    account = db.query(Account).filter(Account.id == user_id).first()
+    if account is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    # Query 3: owned and collaborated lists in one pass, counts aggregated
+    # per list in a derived table rather than per row
+    item_counts = db.query(
+        BucketItem.bucket_list_id,
+        func.count(BucketItem.id).label("item_count"),
+        func.count(case((BucketItem.is_completed == True, 1))).label("completed_count")
+    ).filter(
+        BucketItem.bucket_list_id.in_(accessible_bucket_list_ids(user_id))
+    ).group_by(BucketItem.bucket_list_id).subquery()
+
+    # Newest first, lists_limit applies to owned and collaborated lists each
+    is_owner = BucketList.created_by == user_id
+    ranked_lists = db.query(
+        BucketList.id,
+        BucketList.title,
+        BucketList.description,
+        BucketList.created_by,
+        BucketList.date_created,
+        BucketList.is_private,
+        BucketList.share_token,
+        func.coalesce(item_counts.c.item_count, 0).label("item_count"),
+        func.coalesce(item_counts.c.completed_count, 0).label("completed_count"),
+        func.row_number().over(
+            partition_by=is_owner,
+            order_by=(BucketList.date_created.desc(), BucketList.id.desc())
+        ).label("rank")
+    ).outerjoin(
+        item_counts,
+        item_counts.c.bucket_list_id == BucketList.id
+    ).outerjoin(
+        BucketListCollaborator,
+        (BucketListCollaborator.bucket_list_id == BucketList.id) &
+        (BucketListCollaborator.account_id == user_id)
+    ).filter(
+        or_(
+            is_owner,
+            BucketListCollaborator.account_id == user_id
+        ),
+        BucketList.date_deleted.is_(None)
+    ).subquery()
+
+    bucket_lists = db.query(ranked_lists).filter(
+        ranked_lists.c.rank <= lists_limit
+    ).order_by(ranked_lists.c.date_created.desc(), ranked_lists.c.id.desc()).all()
+
+    owned_bucket_lists = [bl for bl in bucket_lists if bl.created_by == user_id]
+    collaborated_bucket_lists = [bl for bl in bucket_lists if bl.created_by != user_id]
+
+    # Query 4: recently modified items across every accessible list
+    recent_items = []
+    if recent_items_limit:
+        recent_items = read_queries.fetch_item_records(
+            db,
+            select(*read_queries.ITEM_COLUMNS).where(
+                BucketItem.bucket_list_id.in_(accessible_bucket_list_ids(user_id))
+            ).order_by(
+                BucketItem.date_last_modified.desc().nulls_last(),
+                BucketItem.id.desc()
+            ).limit(recent_items_limit)
+        )
+
+    return {
+        "account": account,
+        "owned_bucket_lists": owned_bucket_lists,
+        "collaborated_bucket_lists": collaborated_bucket_lists,
+        "recent_items": recent_items
+    }
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from sqlalchemy.orm import Session
+from typing import Annotated, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from database import get_db
+from routes.account_routes import oauth2_scheme
+from routes.bucket_list_routes import get_current_user_id
+from services import read_queries
+
+# Create the router
+router = APIRouter(
+    prefix="/api/bucket-lists/{bucket_list_id}/history",
+    tags=["history"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+class ItemEventResponse(BaseModel):
+    id: int
+    item_id: int
+    action: str
+    account_id: int
+    date_created: datetime
+    content: Optional[str] = None
+    is_completed: Optional[bool] = None
+    position: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ItemEventPage(BaseModel):
+    skip: int
+    limit: int
+    events: List[ItemEventResponse] = []
+
+
+@router.get("", response_model=ItemEventPage)
+def get_bucket_list_history(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        bucket_list_id: int = Path(...),
+        item_id: Optional[int] = Query(None),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=100),
+        db: Session = Depends(get_db)
+):
+    user_id = get_current_user_id(token)
+
+    # Verify access
+    if not read_queries.has_bucket_list_access(db, bucket_list_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bucket list not found or you don't have access"
+        )
+
+    # Newest first. Events are written in batches, the latest changes can
+    # take up to HISTORY_FLUSH_SECONDS to show up.
+    return {
+        "skip": skip,
+        "limit": limit,
+        "events": read_queries.fetch_item_events(db, bucket_list_id, skip, limit, item_id)
+    }
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Path
+from sqlalchemy.orm import Session
+from typing import Annotated, List
+
+from database import get_db
+from routes.account_routes import oauth2_scheme, ADMIN_ACCOUNT_IDS
+from routes.bucket_list_routes import get_current_user_id
+from services.item_history import get_history_status
+from services.profiling import profile_store
+from services.purge_worker import get_purge_status
+
+# Create the router
+router = APIRouter(
+    prefix="/api/maintenance",
+    tags=["maintenance"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def get_admin_user_id(token: str) -> int:
+    """Get the user ID from the JWT token, only for admin accounts."""
+    user_id = get_current_user_id(token)
+    if user_id not in ADMIN_ACCOUNT_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user_id
+
+
+@router.get("/purge-status", response_model=dict)
+def purge_status(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        db: Session = Depends(get_db)
+):
+    get_admin_user_id(token)
+
+    return get_purge_status(db)
+
+
+@router.get("/history-status", response_model=dict)
+def history_status(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        db: Session = Depends(get_db)
+):
+    get_admin_user_id(token)
+
+    # Summed over every process's history writer
+    return get_history_status(db)
+
+
+@router.get("/profiles", response_model=List[dict])
+def list_profiles(token: Annotated[str, Depends(oauth2_scheme)]):
+    get_admin_user_id(token)
+
+    # Newest first, shared by every worker
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_model=dict)
+def get_profile(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        profile_id: str = Path(...)
+):
+    get_admin_user_id(token)
+
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found, it may have been evicted"
+        )
+
+    return profile
@@ -0,0 +1,267 @@
+"""Read-through cache for whole bucket-list documents.
+
+A document is the serialized BucketListResponse of a list (list + items).
+Documents are keyed by list id, and share tokens map to list ids, so a
+popular shared list is built once and then served from the cache.
+
+The backend is picked from CACHE_URL:
+    none                 caching disabled (default)
+    memory://            in-process LRU, single-process deployments only
+    redis://host:6379/0  any server speaking the Redis protocol
+Invalidations only reach the process that made them with memory://, so
+other gunicorn workers would keep serving stale documents and token
+mappings. gunicorn_conf.py refuses to start several workers with it.
+RedisCache accepts any redis-py compatible client, which is how it is run
+against a local fake (e.g. fakeredis.FakeRedis()).
+
+Write routes call invalidate_bucket_list after committing. It doesn't
+delete the document, it gives the list a new random version, and documents
+are stored under a key holding the version read before loading. A load
+that read the database before the write committed and stores its result
+after the invalidation lands under the old version, which nobody reads
+any more. Versions are never reused, so a version key that expired or was
+evicted only costs a reload. Entries expire after CACHE_TTL_SECONDS.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+CACHE_URL = os.getenv("CACHE_URL", "none")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+# How long a loader may hold the fill lock, and how long others wait on it
+FILL_LOCK_SECONDS = 5
+FILL_WAIT_SECONDS = 2
+FILL_POLL_SECONDS = 0.02
+
+
+class MemoryLRUCache:
+    """Thread-safe LRU with per-entry expiry, local to the process."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        """Set key unless it holds a live value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= time.monotonic():
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def acquire_fill_lock(self, key: str) -> bool:
+        # The in-process single-flight lock in ReadThroughCache is enough
+        return True
+
+    def release_fill_lock(self, key: str):
+        pass
+
+
+class RedisCache:
+    """Backend for anything speaking the Redis protocol.
+
+    The fill lock (SET NX PX) extends stampede protection across processes
+    and hosts sharing the same server.
+    """
+
+    def __init__(self, client, prefix: str = "bucket-lister:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: int):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return bool(self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def acquire_fill_lock(self, key: str) -> bool:
+        return bool(self.client.set(self.prefix + "fill:" + key, "1", nx=True, px=FILL_LOCK_SECONDS * 1000))
+
+    def release_fill_lock(self, key: str):
+        self.client.delete(self.prefix + "fill:" + key)
+
+
+class ReadThroughCache:
+    """JSON read-through cache with stampede protection.
+
+    Concurrent misses on the same key in one process wait on a per-key lock,
+    and across processes on the backend's fill lock, so a cold key triggers
+    a single load.
+    """
+
+    def __init__(self, backend, ttl: int = CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self._key_locks = {}
+        self._key_locks_lock = threading.Lock()
+
+    def _key_lock(self, key: str):
+        with self._key_locks_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = [threading.Lock(), 0]
+            lock[1] += 1
+            return lock
+
+    def _release_key_lock(self, key: str, lock):
+        with self._key_locks_lock:
+            lock[1] -= 1
+            if lock[1] == 0:
+                del self._key_locks[key]
+
+    def _get(self, key: str):
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value):
+        if self.backend is not None:
+            self.backend.set(key, json.dumps(value), self.ttl)
+
+    def delete(self, *keys: str):
+        if self.backend is not None:
+            self.backend.delete(*keys)
+
+    def _version(self, version_key: str) -> str:
+        version = self.backend.get(version_key)
+        if version is None:
+            # First read since it expired, the first process to add one wins
+            candidate = uuid.uuid4().hex[:12]
+            self.backend.add(version_key, candidate, self.ttl * 2)
+            version = self.backend.get(version_key) or candidate
+        return version
+
+    def bump(self, version_key: str):
+        """Give a new version, values loaded under the old one are never read again."""
+        if self.backend is not None:
+            self.backend.set(version_key, uuid.uuid4().hex[:12], self.ttl * 2)
+
+    def get_or_load(self, key: str, loader: Callable, version_key: Optional[str] = None):
+        """Return the cached value for key, calling loader once on a miss.
+
+        A loader returning None is not cached (e.g. list not found). With
+        version_key, the value is stored under the version read before
+        loading, see bump().
+        """
+        if self.backend is None:
+            return loader()
+
+        if version_key is not None:
+            key = f"{key}:{self._version(version_key)}"
+
+        value = self._get(key)
+        if value is not None:
+            return value
+
+        lock = self._key_lock(key)
+        try:
+            with lock[0]:
+                # Someone in this process may have filled it while we waited
+                value = self._get(key)
+                if value is not None:
+                    return value
+
+                if not self.backend.acquire_fill_lock(key):
+                    # Another process is loading, wait for its result
+                    deadline = time.monotonic() + FILL_WAIT_SECONDS
+                    while time.monotonic() < deadline:
+                        time.sleep(FILL_POLL_SECONDS)
+                        value = self._get(key)
+                        if value is not None:
+                            return value
+                    return loader()
+
+                try:
+                    value = loader()
+                    if value is not None:
+                        self.set(key, value)
+                    return value
+                finally:
+                    self.backend.release_fill_lock(key)
+        finally:
+            self._release_key_lock(key, lock)
+
+
+def build_backend(url: str):
+    if url in ("", "none"):
+        return None
+    if url.startswith("memory://"):
+        return MemoryLRUCache()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache.from_url(url)
+    raise ValueError(f"Unsupported CACHE_URL {url!r}")
+
+
+bucket_list_cache = ReadThroughCache(build_backend(CACHE_URL))
+
+
+def bucket_list_key(bucket_list_id: int) -> str:
+    return f"bucket_list:{bucket_list_id}"
+
+
+def bucket_list_version_key(bucket_list_id: int) -> str:
+    return f"bucket_list_version:{bucket_list_id}"
+
+
+def share_token_key(share_token: str) -> str:
+    return f"share_token:{share_token}"
+
+
+def get_or_load_bucket_list(bucket_list_id: int, loader: Callable):
+    """A list's cached document, versioned so invalidations can't be lost."""
+    return bucket_list_cache.get_or_load(
+        bucket_list_key(bucket_list_id), loader, version_key=bucket_list_version_key(bucket_list_id)
+    )
+
+
+def invalidate_bucket_list(bucket_list_id: int, share_token: Optional[str] = None):
+    """Retire a list's cached document, and drop its share token mapping if given."""
+    bucket_list_cache.bump(bucket_list_version_key(bucket_list_id))
+    if share_token:
+        bucket_list_cache.delete(share_token_key(share_token))
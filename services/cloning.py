@@ -0,0 +1,56 @@
+"""Copy a bucket list and its items inside the database.
+
+The whole clone is one statement: the new list is inserted from a select
+of the source row, and the items are inserted from a select of the source
+items joined to the new list's id, both as data-modifying CTEs. Nothing is
+loaded into Python, so the cost in round trips doesn't depend on the list
+size. Positions are copied as they are, fractional keys only need to be
+ordered within their own list.
+"""
+from sqlalchemy import func, insert, literal, select, true
+from sqlalchemy.orm import Session
+
+from models.bucket_list import BucketList, BucketItem
+from services.read_queries import LIST_COLUMNS
+
+
+def clone_bucket_list(db: Session, bucket_list_id: int, user_id: int, criteria, title: str = None):
+    """Clone the list matching ``criteria`` for the user, as a private list.
+
+    ``criteria`` filters BucketList and decides who may clone (see the
+    routes). Returns the new list's row with an extra ``item_count``, or
+    None when nothing matched. Items start uncompleted.
+    """
+    new_list = insert(BucketList).from_select(
+        ["title", "description", "created_by", "is_private"],
+        select(
+            literal(title) if title is not None else BucketList.title,
+            BucketList.description,
+            literal(user_id),
+            true()
+        ).where(
+            BucketList.id == bucket_list_id,
+            *criteria
+        )
+    ).returning(*LIST_COLUMNS).cte("new_list")
+
+    # Filtering on the source id (not a join) keeps the read on one partition
+    new_items = insert(BucketItem).from_select(
+        ["bucket_list_id", "content", "is_completed", "last_modified_by", "position"],
+        select(
+            new_list.c.id,
+            BucketItem.content,
+            literal(False),
+            literal(user_id),
+            BucketItem.position
+        ).select_from(BucketItem).join(new_list, true()).where(
+            BucketItem.bucket_list_id == bucket_list_id
+        ).order_by(BucketItem.position, BucketItem.id)
+    ).returning(BucketItem.id).cte("new_items")
+
+    return db.execute(
+        select(
+            new_list,
+            select(func.count()).select_from(new_items).scalar_subquery().label("item_count")
+        )
+    ).first()
@@ -0,0 +1,171 @@
+"""Append-only history of bucket item changes, written off the request path.
+
+The item routes call history_writer.record() after their commit. That only
+appends the event to an in-memory buffer. A writer thread drains the buffer
+every HISTORY_FLUSH_SECONDS, or as soon as a full batch is waiting, and
+bulk-inserts it with one multi-row INSERT per HISTORY_BATCH_SIZE events. A
+write request never waits on the history table.
+
+Events still buffered when a process dies are lost, stop() flushes what is
+left on a clean shutdown. If the database is unavailable, failed batches go
+back to the front of the buffer and are retried on the next flush. The
+buffer is capped at HISTORY_MAX_PENDING events. Past that, new events are
+dropped and counted, so the buffer can't grow without bound during an
+outage.
+
+Counters are kept per process and saved to the database by
+services/worker_status.py, GET /api/maintenance/history-status sums them
+over every process.
+
+benchmarks/history_bench.py measures what record() adds to the write routes.
+"""
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.bucket_list import BucketItemEvent
+from services.worker_status import StatusPublisher, load_status
+
+logger = logging.getLogger(__name__)
+
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", "0.5"))
+HISTORY_MAX_PENDING = int(os.getenv("HISTORY_MAX_PENDING", "100000"))
+
+# Counters for this process, saved for GET /api/maintenance/history-status
+COUNTERS = ("events_written", "batches", "events_dropped", "errors")
+metrics = {
+    "events_written": 0,
+    "batches": 0,
+    "events_dropped": 0,
+    "errors": 0,
+    "last_flush_at": None,
+}
+_metrics_lock = threading.Lock()
+
+
+def _record(**changes):
+    with _metrics_lock:
+        for key, value in changes.items():
+            if key in COUNTERS:
+                metrics[key] += value
+            else:
+                metrics[key] = value
+
+
+class HistoryWriter:
+    """Buffers item events and bulk-inserts them from a background thread."""
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = HISTORY_BATCH_SIZE,
+                 flush_interval: float = HISTORY_FLUSH_SECONDS, max_pending: int = HISTORY_MAX_PENDING):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # deque appends and pops are atomic, record() takes no lock
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, item, action: str, account_id: int):
+        """Queue an event with the item's current state. No-op unless started."""
+        if self._thread is None:
+            return
+        if len(self._pending) >= self.max_pending:
+            _record(events_dropped=1)
+            return
+        self._pending.append({
+            "bucket_list_id": item.bucket_list_id,
+            "item_id": item.id,
+            "action": action,
+            "account_id": account_id,
+            "date_created": datetime.now(timezone.utc),
+            "content": item.content,
+            "is_completed": item.is_completed,
+            "position": item.position,
+        })
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Insert everything buffered so far, batch by batch."""
+        written = 0
+        if not self._pending:
+            return written
+
+        db = self.session_factory()
+        try:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popleft())
+                try:
+                    db.execute(insert(BucketItemEvent), batch)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    # Back in front, in order, for the next flush
+                    self._pending.extendleft(reversed(batch))
+                    _record(errors=1)
+                    logger.exception("Writing %s item history events failed, retrying later", len(batch))
+                    break
+                written += len(batch)
+                _record(events_written=len(batch), batches=1)
+        finally:
+            db.close()
+            _record(last_flush_at=datetime.now(timezone.utc))
+
+        return written
+
+    def run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                _record(errors=1)
+                logger.exception("Item history flush failed")
+            status_publisher.save()
+        self.flush()
+        status_publisher.save(force=True)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def _snapshot():
+    with _metrics_lock:
+        status = dict(metrics)
+    status["events_pending"] = history_writer.pending()
+    return status
+
+
+status_publisher = StatusPublisher("history", _snapshot)
+
+
+def get_history_status(db: Session):
+    """Counters and buffered events of every process."""
+    return load_status(db, "history", COUNTERS + ("events_pending",))
+
+
+history_writer = HistoryWriter()
@@ -0,0 +1,213 @@
+"""Fractional indexing for bucket item ordering.
+
+Positions are base-62 strings compared byte-wise (the column uses the "C"
+collation), so an item can always be placed between two neighbours by
+writing a single row. Keys are made of an integer part, whose length is
+encoded by its first character, followed by an optional fraction. Appends
+only bump the integer part and stay short; repeated inserts between the
+same two items grow the fraction, which is what rebalancing cleans up.
+
+Every transaction that computes or rewrites positions of a list first
+locks the list row with lock_list_order(), so concurrent appends can't
+read the same last key and a rebalance can't overwrite a move.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.bucket_list import BucketList, BucketItem
+from services.cache import invalidate_bucket_list
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+# Keys longer than this trigger a background rebalance of the list
+MAX_POSITION_LENGTH = 32
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """Return a fraction strictly between a and b (b=None means the end)."""
+    zero = DIGITS[0]
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} is not smaller than {b!r}")
+    if a[-1:] == zero or (b is not None and b[-1:] == zero):
+        raise ValueError("Fractional part has a trailing zero")
+
+    if b is not None:
+        # Skip the common prefix, padding a with zeros
+        n = 0
+        while (a[n] if n < len(a) else zero) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[round((digit_a + digit_b) / 2)]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid position head {head!r}")
+
+
+def _split(key: str) -> tuple[str, str]:
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid position {key!r}")
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid position {key!r}")
+    integer, fraction = key[:length], key[length:]
+    if fraction[-1:] == DIGITS[0]:
+        raise ValueError(f"Invalid position {key!r}")
+    return integer, fraction
+
+
+def _increment_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+
+    # Carried out of the integer part, move to the next length
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """Generate a position strictly between a and b.
+
+    None stands for the start (a) or the end (b) of the list.
+    """
+    if a is None and b is None:
+        return "a" + DIGITS[0]
+
+    if a is None:
+        integer_b, fraction_b = _split(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        key = _decrement_integer(integer_b)
+        if key is None:
+            raise ValueError("Cannot decrement any further")
+        return key
+
+    if b is None:
+        integer_a, fraction_a = _split(a)
+        key = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if key is None else key
+
+    if a >= b:
+        raise ValueError(f"{a!r} is not smaller than {b!r}")
+    integer_a, fraction_a = _split(a)
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    key = _increment_integer(integer_a)
+    if key is None:
+        raise ValueError("Cannot increment any further")
+    if key < b:
+        return key
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def lock_list_order(db: Session, bucket_list_id: int):
+    """Serialise position changes of a list until the transaction ends.
+
+    FOR NO KEY UPDATE conflicts with itself but not with the key share
+    locks that item inserts take through the foreign key.
+    """
+    db.execute(
+        select(BucketList.id).where(BucketList.id == bucket_list_id).with_for_update(key_share=True)
+    )
+
+
+def rebalance_positions(db: Session, bucket_list_id: int):
+    """Rewrite every position of a list with short, evenly spaced keys.
+
+    Items without a position (created before ordering existed) keep their
+    relative id order at the end of the list.
+    """
+    lock_list_order(db, bucket_list_id)
+    rows = db.query(BucketItem.id).filter(
+        BucketItem.bucket_list_id == bucket_list_id
+    ).order_by(
+        BucketItem.position.asc().nulls_last(),
+        BucketItem.id
+    ).all()
+
+    position = None
+    mappings = []
+    for (item_id,) in rows:
+        position = key_between(position, None)
+        mappings.append({"bucket_list_id": bucket_list_id, "id": item_id, "position": position})
+
+    if mappings:
+        db.bulk_update_mappings(BucketItem, mappings)
+    db.commit()
+
+
+def rebalance_positions_task(bucket_list_id: int):
+    """Background task wrapper, runs on its own session."""
+    db = SessionLocal()
+    try:
+        rebalance_positions(db, bucket_list_id)
+    finally:
+        db.close()
+    invalidate_bucket_list(bucket_list_id)
+
+
+if __name__ == "__main__":
+    # Backfill positions for lists created before the column existed:
+    #   python -m services.item_ordering
+    db = SessionLocal()
+    try:
+        list_ids = db.query(BucketItem.bucket_list_id).filter(
+            BucketItem.position.is_(None)
+        ).distinct().all()
+        for (list_id,) in list_ids:
+            rebalance_positions(db, list_id)
+            invalidate_bucket_list(list_id)
+            print(f"Rebalanced bucket list {list_id}")
+    finally:
+        db.close()
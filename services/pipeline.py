@@ -0,0 +1,60 @@
+"""Send independent statements of a request in a single network flush.
+
+With the psycopg 3 driver (DB_DRIVER=psycopg) the statements are queued
+with Postgres pipeline mode and sent together, so N statements cost one
+round trip instead of N. Where the connection allows it, hot statements
+can also be prepared once per connection (DB_PREPARE_THRESHOLD in
+database.py, off by default for the transaction pooler). With psycopg2 they
+simply run one after the other, so callers don't need to care.
+
+Statements run inside the session's current transaction. Pipelined
+statements bypass SQLAlchemy's cursor events, so each flush is added to
+the request profile's SQL timeline as one entry, with the statements
+joined and their count in "pipelined".
+
+benchmarks/pipeline_bench.py measures both paths with injected latency.
+"""
+from sqlalchemy.orm import Session
+
+from services.profiling import current_profile, record_sql
+
+
+def execute_pipelined(db: Session, statements):
+    """Execute Core statements, return one list of row tuples per statement.
+
+    Statements without a result (no RETURNING) yield an empty list.
+    """
+    connection = db.connection()
+    driver_connection = connection.connection.driver_connection
+
+    if not hasattr(driver_connection, "pipeline"):
+        results = []
+        for statement in statements:
+            result = connection.execute(statement)
+            results.append(result.all() if result.returns_rows else [])
+        return results
+
+    compiled = [
+        statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+        for statement in statements
+    ]
+    profile = current_profile.get()
+    if profile is not None:
+        profile.join_current_thread()
+        started_ms = profile.elapsed_ms()
+
+    cursors = []
+    with driver_connection.pipeline():
+        for statement in compiled:
+            cursor = driver_connection.cursor()
+            cursor.execute(str(statement), statement.params)
+            cursors.append(cursor)
+    # Leaving the pipeline block syncs, every result is available now
+    if profile is not None:
+        record_sql(profile, started_ms, ";\n".join(str(statement) for statement in compiled),
+                   pipelined=len(compiled))
+    results = []
+    for cursor in cursors:
+        results.append(cursor.fetchall() if cursor.description is not None else [])
+        cursor.close()
+    return results
@@ -0,0 +1,272 @@
+"""Opt-in profiling of single requests.
+
+A request is profiled when an admin sends ``X-Profile: 1`` with their bearer
+token, or when it is picked by PROFILE_SAMPLE_RATE (0 by default). Its
+profile holds:
+  - wall-clock samples of the stacks running the request, in collapsed
+    "frame;frame;frame count" form that flame graph tools read directly
+  - an ordered timeline of the SQL statements it executed
+
+Sync handlers and dependencies run on threadpool workers, so a thread
+joins the profile when it executes SQL on the request's behalf (the cursor
+events below check the profiling context var; get_db runs a statement as
+soon as it opens its session). The event loop thread is sampled from the
+start. A worker that moves on to another request while the profile is
+still open keeps being sampled, so samples outside the request's own
+frames may come from concurrent requests.
+
+Profiles are saved to the request_profile table, keeping the newest
+PROFILE_STORE_SIZE, so the admin endpoints in routes/maintenance_routes.py
+find them whichever worker served the request. Saving happens on a thread
+after the response has been sent. Unprofiled requests only pay for a header
+lookup and a context var read per SQL statement.
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import jwt
+from sqlalchemy import delete, event, insert, select
+
+from database import engine, SessionLocal
+from models.request_profile import RequestProfileRecord
+from routes.account_routes import SECRET_KEY, ALGORITHM, ADMIN_ACCOUNT_IDS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.001"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+MAX_STACK_DEPTH = 64
+MAX_SQL_STATEMENTS = 1000
+
+current_profile = ContextVar("current_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = datetime.now(timezone.utc)
+        self.status_code = None
+        self.duration_ms = None
+        self.samples = Counter()
+        self.sample_count = 0
+        self.sql = []
+        self.thread_ids = {threading.get_ident()}
+        self._start = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.id[:8]}", daemon=True)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def join_current_thread(self):
+        self.thread_ids.add(threading.get_ident())
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self, status_code):
+        self._stop.set()
+        self._sampler.join()
+        self.status_code = status_code
+        self.duration_ms = self.elapsed_ms()
+
+    def _sample(self):
+        names = {}
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(PROFILE_INTERVAL_SECONDS):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == sampler_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names[thread_id] = next(
+                        (t.name for t in threading.enumerate() if t.ident == thread_id),
+                        str(thread_id)
+                    )
+                stack.append(f"thread {names[thread_id]}")
+                self.samples[";".join(reversed(stack))] += 1
+                self.sample_count += 1
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "duration_ms": self.duration_ms,
+            "sample_count": self.sample_count,
+            "sql_count": len(self.sql),
+        }
+
+    def to_dict(self):
+        data = self.summary()
+        data["interval_ms"] = PROFILE_INTERVAL_SECONDS * 1000
+        data["flame"] = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        data["sql"] = self.sql
+        return data
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in the database, shared by all workers."""
+
+    def __init__(self, session_factory=SessionLocal, max_size: int = PROFILE_STORE_SIZE):
+        self.session_factory = session_factory
+        self.max_size = max_size
+
+    def add(self, profile: RequestProfile):
+        data = profile.to_dict()
+        data["started_at"] = profile.started_at.isoformat()
+        with self.session_factory() as db:
+            db.execute(insert(RequestProfileRecord).values(
+                id=profile.id,
+                method=profile.method,
+                path=profile.path,
+                trigger=profile.trigger,
+                started_at=profile.started_at,
+                status_code=profile.status_code,
+                duration_ms=profile.duration_ms,
+                sample_count=profile.sample_count,
+                sql_count=len(profile.sql),
+                data=data
+            ))
+            newest = select(RequestProfileRecord.id).order_by(
+                RequestProfileRecord.started_at.desc()
+            ).limit(self.max_size)
+            db.execute(delete(RequestProfileRecord).where(RequestProfileRecord.id.not_in(newest.scalar_subquery())))
+            db.commit()
+
+    def get(self, profile_id: str):
+        """The full profile as a dict, or None."""
+        with self.session_factory() as db:
+            return db.execute(
+                select(RequestProfileRecord.data).where(RequestProfileRecord.id == profile_id)
+            ).scalar()
+
+    def list(self):
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(
+                    RequestProfileRecord.id,
+                    RequestProfileRecord.method,
+                    RequestProfileRecord.path,
+                    RequestProfileRecord.trigger,
+                    RequestProfileRecord.started_at,
+                    RequestProfileRecord.status_code,
+                    RequestProfileRecord.duration_ms,
+                    RequestProfileRecord.sample_count,
+                    RequestProfileRecord.sql_count
+                ).order_by(RequestProfileRecord.started_at.desc())
+            ).all()
+        return [dict(row._mapping) for row in rows]
+
+
+profile_store = ProfileStore()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None:
+        profile.join_current_thread()
+        conn.info.setdefault("profile_query_start", []).append(profile.elapsed_ms())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None and conn.info.get("profile_query_start"):
+        record_sql(profile, conn.info["profile_query_start"].pop(), statement, executemany)
+
+
+def record_sql(profile: RequestProfile, started_ms: float, statement: str, executemany: bool = False, **details):
+    """Add a statement that started at started_ms and just finished to the timeline."""
+    if len(profile.sql) < MAX_SQL_STATEMENTS:
+        profile.sql.append({
+            "offset_ms": round(started_ms, 3),
+            "duration_ms": round(profile.elapsed_ms() - started_ms, 3),
+            "statement": statement,
+            "executemany": executemany,
+            **details,
+        })
+
+
+def _is_admin_request(headers) -> bool:
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload.get("sub")) in ADMIN_ACCOUNT_IDS
+    except (jwt.PyJWTError, TypeError, ValueError):
+        return False
+
+
+class ProfilingMiddleware:
+    """ASGI middleware starting a profile for opted-in requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        trigger = None
+        if PROFILE_HEADER in (name for name, _ in scope["headers"]):
+            headers = dict(scope["headers"])
+            if headers[PROFILE_HEADER] == b"1" and _is_admin_request(headers):
+                trigger = "header"
+        elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            trigger = "sample"
+
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            current_profile.reset(token)
+            profile.stop(status_code)
+            try:
+                # The response is out already, keep the event loop free
+                await asyncio.to_thread(profile_store.add, profile)
+            except Exception:
+                logger.exception("Saving profile %s failed", profile.id)
@@ -0,0 +1,221 @@
+"""Background purge of soft-deleted bucket lists.
+
+delete_bucket_list only stamps date_deleted. This worker picks those lists
+up and deletes their items in bounded batches, committing after each one so
+no single transaction holds locks on a large list. All state lives in the
+database, so a restarted worker simply resumes where the last one stopped.
+
+Runs as a thread inside each app process (see main.py) or standalone with
+``python -m services.purge_worker``. A Postgres advisory lock per list keeps
+several workers from purging the same list at once. It is transaction
+scoped and taken again in every batch, so it is released by each commit or
+rollback and can't outlive the transaction on a pooled connection.
+
+Progress counters are kept per process and saved to the database by
+services/worker_status.py, GET /api/maintenance/purge-status sums them
+over every process.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.bucket_list import BucketList, BucketItem, BucketItemEvent, BucketListCollaborator
+from services.worker_status import StatusPublisher, load_status
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+PURGE_INTERVAL_SECONDS = float(os.getenv("PURGE_INTERVAL_SECONDS", "5"))
+
+# Namespace for pg advisory locks taken by this worker
+PURGE_LOCK_CLASS = 4201
+
+# Counters for this process, saved for GET /api/maintenance/purge-status
+COUNTERS = ("lists_purged", "items_purged", "events_purged", "batches", "errors")
+metrics = {
+    "lists_purged": 0,
+    "items_purged": 0,
+    "events_purged": 0,
+    "batches": 0,
+    "errors": 0,
+    "current_bucket_list_id": None,
+    "last_run_at": None,
+}
+_metrics_lock = threading.Lock()
+
+
+def _record(**changes):
+    with _metrics_lock:
+        for key, value in changes.items():
+            if key in COUNTERS:
+                metrics[key] += value
+            else:
+                metrics[key] = value
+
+
+def _snapshot():
+    with _metrics_lock:
+        return dict(metrics)
+
+
+status_publisher = StatusPublisher("purge", _snapshot)
+
+
+def get_purge_status(db: Session):
+    """Counters of every process plus what is still waiting in the database."""
+    pending_lists = select(BucketList.id).where(BucketList.date_deleted.isnot(None))
+    pending_list_count, pending_item_count = db.execute(
+        select(
+            select(func.count()).select_from(pending_lists.subquery()).scalar_subquery(),
+            select(func.count(BucketItem.id)).where(
+                BucketItem.bucket_list_id.in_(pending_lists)
+            ).scalar_subquery()
+        )
+    ).one()
+
+    status = load_status(db, "purge", COUNTERS)
+    status["pending_lists"] = pending_list_count
+    status["pending_items"] = pending_item_count
+    return status
+
+
+def _try_lock(db: Session, bucket_list_id: int) -> bool:
+    """Lock the list for the current transaction, False if another worker has it."""
+    return db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:class_id, :object_id)"),
+        {"class_id": PURGE_LOCK_CLASS, "object_id": bucket_list_id}
+    ).scalar()
+
+
+def _purge_rows(db: Session, model, bucket_list_id: int, batch_size: int, counter: str) -> bool:
+    """Delete a list's rows of ``model`` one committed batch at a time.
+
+    Returns False when another worker took the list's lock in between.
+    """
+    while True:
+        if not _try_lock(db, bucket_list_id):
+            db.rollback()
+            return False
+        batch = select(model.id).where(
+            model.bucket_list_id == bucket_list_id
+        ).limit(batch_size).scalar_subquery()
+        deleted = db.execute(
+            delete(model).where(
+                model.bucket_list_id == bucket_list_id,
+                model.id.in_(batch)
+            ),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        db.commit()
+
+        if deleted:
+            _record(**{counter: deleted, "batches": 1})
+            status_publisher.save()
+        if deleted < batch_size:
+            return True
+
+
+def purge_bucket_list(db: Session, bucket_list_id: int, batch_size: int = PURGE_BATCH_SIZE) -> bool:
+    """Delete a soft-deleted list's items and history batch by batch, then the list.
+
+    Returns False, leaving the rest for later, when another worker holds
+    the list's lock.
+    """
+    if not _purge_rows(db, BucketItem, bucket_list_id, batch_size, "items_purged"):
+        return False
+    # Several events per item, as many batches again or more
+    if not _purge_rows(db, BucketItemEvent, bucket_list_id, batch_size, "events_purged"):
+        return False
+
+    if not _try_lock(db, bucket_list_id):
+        db.rollback()
+        return False
+    db.execute(
+        delete(BucketListCollaborator).where(BucketListCollaborator.bucket_list_id == bucket_list_id),
+        execution_options={"synchronize_session": False}
+    )
+    db.execute(
+        delete(BucketList).where(
+            BucketList.id == bucket_list_id,
+            BucketList.date_deleted.isnot(None)
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+    _record(lists_purged=1)
+    return True
+
+
+def run_once(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Purge every soft-deleted list this worker can lock, oldest first."""
+    purged = 0
+    list_ids = []
+    db = SessionLocal()
+    try:
+        list_ids = db.execute(
+            select(BucketList.id).where(
+                BucketList.date_deleted.isnot(None)
+            ).order_by(BucketList.date_deleted)
+        ).scalars().all()
+        db.commit()
+
+        for bucket_list_id in list_ids:
+            _record(current_bucket_list_id=bucket_list_id)
+            try:
+                if purge_bucket_list(db, bucket_list_id, batch_size):
+                    purged += 1
+                    logger.info("Purged bucket list %s", bucket_list_id)
+            finally:
+                db.rollback()
+                _record(current_bucket_list_id=None)
+    finally:
+        db.close()
+        _record(last_run_at=datetime.now(timezone.utc))
+        # Final numbers right away after a purge, throttled while idle
+        status_publisher.save(force=bool(list_ids))
+
+    return purged
+
+
+class PurgeWorker:
+    """Polls for soft-deleted lists until stopped."""
+
+    def __init__(self, interval: float = PURGE_INTERVAL_SECONDS, batch_size: int = PURGE_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                run_once(self.batch_size)
+            except Exception:
+                _record(errors=1)
+                status_publisher.save()
+                logger.exception("Bucket list purge failed, retrying later")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="purge-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        status_publisher.save(force=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    worker = PurgeWorker()
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,220 @@
+"""Column-projected read queries for the GET routes.
+
+These select exactly the columns the response models need, through Core
+select() statements. Nothing is added to the session identity map and no
+attribute instrumentation is set up. Rows are unpacked into __slots__
+records, which pydantic's from_attributes reads much faster than Row
+objects (Row attribute access goes through a slow fallback).
+
+benchmarks/read_queries_bench.py compares this path with full ORM loading.
+"""
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from models.account import Account
+from models.bucket_list import BucketList, BucketItem, BucketItemEvent, BucketListCollaborator
+
+ITEM_COLUMNS = (
+    BucketItem.id,
+    BucketItem.bucket_list_id,
+    BucketItem.content,
+    BucketItem.is_completed,
+    BucketItem.last_modified_by,
+    BucketItem.date_last_modified,
+    BucketItem.position,
+)
+
+LIST_COLUMNS = (
+    BucketList.id,
+    BucketList.title,
+    BucketList.description,
+    BucketList.created_by,
+    BucketList.date_created,
+    BucketList.is_private,
+    BucketList.share_token,
+)
+
+ITEM_ORDER = (BucketItem.position, BucketItem.id)
+
+
+class BucketItemRecord:
+    __slots__ = ("id", "bucket_list_id", "content", "is_completed", "last_modified_by", "date_last_modified",
+                 "position")
+
+    def __init__(self, row):
+        (self.id, self.bucket_list_id, self.content, self.is_completed,
+         self.last_modified_by, self.date_last_modified, self.position) = row
+
+
+class BucketListRecord:
+    __slots__ = ("id", "title", "description", "created_by", "date_created", "is_private", "share_token", "items")
+
+    def __init__(self, row, items=()):
+        (self.id, self.title, self.description, self.created_by,
+         self.date_created, self.is_private, self.share_token) = row
+        self.items = items
+
+
+def _is_collaborator(bucket_list_id, user_id: int):
+    return exists().where(
+        BucketListCollaborator.bucket_list_id == bucket_list_id,
+        BucketListCollaborator.account_id == user_id
+    )
+
+
+def accessible_criteria(bucket_list_id: int, user_id: int):
+    """Filter for a live list the user owns or collaborates on."""
+    return (
+        BucketList.id == bucket_list_id,
+        BucketList.date_deleted.is_(None),
+        or_(BucketList.created_by == user_id, _is_collaborator(bucket_list_id, user_id))
+    )
+
+
+def shared_criteria(share_token: str):
+    """Filter for a live list currently shared under the token."""
+    return (
+        BucketList.share_token == share_token,
+        BucketList.is_private == False,
+        BucketList.date_deleted.is_(None)
+    )
+
+
+def fetch_item_records(db: Session, statement):
+    """Run a select over ITEM_COLUMNS and return BucketItemRecords."""
+    return [BucketItemRecord(row) for row in db.execute(statement)]
+
+
+def bucket_list_select(bucket_list_id: int):
+    return select(*LIST_COLUMNS).where(
+        BucketList.id == bucket_list_id,
+        BucketList.date_deleted.is_(None)
+    )
+
+
+def items_select(bucket_list_id: int):
+    return select(*ITEM_COLUMNS).where(
+        BucketItem.bucket_list_id == bucket_list_id
+    ).order_by(*ITEM_ORDER)
+
+
+def fetch_items(db: Session, bucket_list_id: int):
+    return fetch_item_records(db, items_select(bucket_list_id))
+
+
+def _attach_items(db: Session, rows):
+    """Build list records and fill their items with a single IN query."""
+    records = [BucketListRecord(row, []) for row in rows]
+    if records:
+        by_id = {record.id: record for record in records}
+        items = fetch_item_records(
+            db,
+            select(*ITEM_COLUMNS).where(
+                BucketItem.bucket_list_id.in_(by_id)
+            ).order_by(BucketItem.bucket_list_id, *ITEM_ORDER)
+        )
+        for item in items:
+            by_id[item.bucket_list_id].items.append(item)
+    return records
+
+
+def fetch_owned_bucket_lists(db: Session, user_id: int, skip: int, limit: int):
+    rows = db.execute(
+        select(*LIST_COLUMNS).where(
+            BucketList.created_by == user_id,
+            BucketList.date_deleted.is_(None)
+        ).order_by(BucketList.id).offset(skip).limit(limit)
+    ).all()
+    return _attach_items(db, rows)
+
+
+def fetch_collaborated_bucket_lists(db: Session, user_id: int, skip: int, limit: int):
+    rows = db.execute(
+        select(*LIST_COLUMNS).join(
+            BucketListCollaborator,
+            BucketListCollaborator.bucket_list_id == BucketList.id
+        ).where(
+            BucketListCollaborator.account_id == user_id,
+            BucketList.date_deleted.is_(None)
+        ).order_by(BucketList.id).offset(skip).limit(limit)
+    ).all()
+    return _attach_items(db, rows)
+
+
+def fetch_accessible_bucket_list(db: Session, bucket_list_id: int, user_id: int):
+    """The list without items if the user owns or collaborates on it, else None."""
+    row = db.execute(
+        select(*LIST_COLUMNS).where(*accessible_criteria(bucket_list_id, user_id))
+    ).first()
+    return BucketListRecord(row) if row else None
+
+
+def has_bucket_list_access(db: Session, bucket_list_id: int, user_id: int) -> bool:
+    return db.execute(
+        select(exists().where(*accessible_criteria(bucket_list_id, user_id)))
+    ).scalar()
+
+
+def fetch_bucket_list_with_items(db: Session, bucket_list_id: int):
+    row = db.execute(bucket_list_select(bucket_list_id)).first()
+    if row is None:
+        return None
+    return BucketListRecord(row, fetch_items(db, bucket_list_id))
+
+
+def fetch_shared_bucket_list_id(db: Session, share_token: str):
+    return db.execute(
+        select(BucketList.id).where(*shared_criteria(share_token))
+    ).scalar()
+
+
+def fetch_collaborators(db: Session, bucket_list_id: int, skip: int, limit: int):
+    """A page of collaborators with account info and the total (window count)."""
+    return db.execute(
+        select(
+            BucketListCollaborator.account_id,
+            Account.username,
+            BucketListCollaborator.is_owner,
+            BucketListCollaborator.access_date,
+            func.count().over().label("total")
+        ).join(
+            Account,
+            Account.id == BucketListCollaborator.account_id
+        ).where(
+            BucketListCollaborator.bucket_list_id == bucket_list_id
+        ).order_by(
+            BucketListCollaborator.is_owner.desc(),
+            BucketListCollaborator.access_date.desc(),
+            BucketListCollaborator.account_id
+        ).offset(skip).limit(limit)
+    ).all()
+
+
+def count_collaborators(db: Session, bucket_list_id: int) -> int:
+    return db.execute(
+        select(func.count()).select_from(BucketListCollaborator).where(
+            BucketListCollaborator.bucket_list_id == bucket_list_id
+        )
+    ).scalar()
+
+
+def fetch_item_events(db: Session, bucket_list_id: int, skip: int, limit: int, item_id: int = None):
+    """A page of a list's item history, newest first."""
+    statement = select(
+        BucketItemEvent.id,
+        BucketItemEvent.item_id,
+        BucketItemEvent.action,
+        BucketItemEvent.account_id,
+        BucketItemEvent.date_created,
+        BucketItemEvent.content,
+        BucketItemEvent.is_completed,
+        BucketItemEvent.position
+    ).where(
+        BucketItemEvent.bucket_list_id == bucket_list_id
+    )
+    if item_id is not None:
+        statement = statement.where(BucketItemEvent.item_id == item_id)
+    # Served backwards by the (bucket_list_id, id) index
+    return db.execute(
+        statement.order_by(BucketItemEvent.id.desc()).offset(skip).limit(limit)
+    ).all()
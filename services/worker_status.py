@@ -0,0 +1,98 @@
+"""Background worker counters shared through the database.
+
+The purge worker and the history writer count what they do in memory, per
+process. With several gunicorn workers each process saves a snapshot of
+its counters to the worker_status table, at most every
+WORKER_STATUS_SECONDS, and the maintenance endpoints read every live
+process's snapshot back. Any worker answering a status call then reports
+the same numbers, up to WORKER_STATUS_SECONDS old.
+
+Snapshots not refreshed for WORKER_STATUS_EXPIRE_SECONDS belong to
+processes that stopped. They are left out of the status and deleted on
+the next save.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.worker_status import WorkerStatusRecord
+
+logger = logging.getLogger(__name__)
+
+WORKER_STATUS_SECONDS = float(os.getenv("WORKER_STATUS_SECONDS", "5"))
+WORKER_STATUS_EXPIRE_SECONDS = float(os.getenv("WORKER_STATUS_EXPIRE_SECONDS", "300"))
+
+
+def worker_name() -> str:
+    # Read on every save, gunicorn forks workers after this module is imported
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class StatusPublisher:
+    """Saves a component's counters for this process, throttled."""
+
+    def __init__(self, component: str, snapshot, session_factory=SessionLocal,
+                 interval: float = WORKER_STATUS_SECONDS):
+        self.component = component
+        self.snapshot = snapshot
+        self.session_factory = session_factory
+        self.interval = interval
+        self._saved_at = None
+        self._lock = threading.Lock()
+
+    def save(self, force: bool = False):
+        """Upsert this process's snapshot, unless one was saved less than interval ago."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._saved_at is not None and now - self._saved_at < self.interval:
+                return
+            self._saved_at = now
+
+        data = {key: _json_value(value) for key, value in self.snapshot().items()}
+        updated_at = datetime.now(timezone.utc)
+        try:
+            with self.session_factory() as db:
+                db.execute(insert(WorkerStatusRecord).values(
+                    component=self.component,
+                    worker=worker_name(),
+                    updated_at=updated_at,
+                    data=data
+                ).on_conflict_do_update(
+                    index_elements=["component", "worker"],
+                    set_={"updated_at": updated_at, "data": data}
+                ))
+                db.execute(delete(WorkerStatusRecord).where(
+                    WorkerStatusRecord.component == self.component,
+                    WorkerStatusRecord.updated_at < updated_at - timedelta(seconds=WORKER_STATUS_EXPIRE_SECONDS)
+                ))
+                db.commit()
+        except Exception:
+            logger.exception("Saving %s status failed", self.component)
+
+
+def load_status(db: Session, component: str, counters) -> dict:
+    """Every live process's snapshot, with ``counters`` summed over them."""
+    rows = db.execute(
+        select(WorkerStatusRecord.worker, WorkerStatusRecord.updated_at, WorkerStatusRecord.data).where(
+            WorkerStatusRecord.component == component,
+            WorkerStatusRecord.updated_at >= datetime.now(timezone.utc) - timedelta(
+                seconds=WORKER_STATUS_EXPIRE_SECONDS)
+        ).order_by(WorkerStatusRecord.worker)
+    ).all()
+
+    workers = [{"worker": row.worker, "updated_at": row.updated_at, **row.data} for row in rows]
+    status = {name: sum(worker.get(name) or 0 for worker in workers) for name in counters}
+    status["workers"] = workers
+    return status